@@ -0,0 +1,7 @@
+"""Shims for differences between supported Python versions"""
+
+import sys
+
+# @dataclass(**DATACLASS_SLOTS): slotted (no per-instance __dict__) where
+# dataclasses support it, 3.10+
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
@@ -101,7 +101,13 @@ def install(
         
         # Get LLM recommendations (with community warnings)
         console.print("\n[yellow]🤖 Analyzing results and checking for known issues...[/yellow]")
-        recommended_results = llm.rank_and_recommend(query, ranked_results[:20], profile, check_community=True)
+        recommended_results = llm.rank_and_recommend(
+            query,
+            ranked_results[:20],
+            profile,
+            check_community=True,
+            on_recommended=lambda r: console.print(f"[dim]Best match: {r.name} ({r.manager}), finishing analysis...[/dim]")
+        )
         
         # Display results with enhanced formatting
         console.print("\n[bold cyan]📦 Search Results:[/bold cyan]\n")
@@ -578,9 +584,9 @@ def config_cmd(
                 value = typer.prompt("Enter API key", hide_input=True)
             
             if config.llm_provider == "anthropic":
-                config.anthropic_api_key = value
+                config = config.model_copy(update={"anthropic_api_key": value})
             elif config.llm_provider == "openai":
-                config.openai_api_key = value
+                config = config.model_copy(update={"openai_api_key": value})
             
             save_config(config)
             console.print(f"[green]✓ API key saved for {config.llm_provider}[/green]")
@@ -593,12 +599,14 @@ def config_cmd(
                 console.print("[red]Invalid provider. Choose: anthropic, openai, or ollama[/red]")
                 sys.exit(1)
             
-            config.llm_provider = value
+            update = {"llm_provider": value}
             
             if value == "anthropic":
-                config.model_name = "claude-3-5-sonnet-20241022"
+                update["model_name"] = "claude-3-5-sonnet-20241022"
             elif value == "openai":
-                config.model_name = "gpt-4-turbo-preview"
+                update["model_name"] = "gpt-4-turbo-preview"
+            
+            config = config.model_copy(update=update)
             
             save_config(config)
             console.print(f"[green]✓ LLM provider set to {value}[/green]")
@@ -578,40 +578,115 @@ def install(
                 console.print(f"[yellow]💡 {status['suggestion']}[/yellow]")
         
 
-        # Handle multiple packages
+        # Created early so its background file indexing overlaps search/ranking
+        from .conflict_oracle import ConflictOracle
+
+        oracle = ConflictOracle(config.cache_dir, license.tier)
+        system_info = {
+            "gpu": getattr(profile, "gpu", ""),
+            "session_type": getattr(profile, "session_type", ""),
+            "kernel": getattr(profile, "kernel_version", "")
+        }
+        use_recommendations = can_use_llm and check_license_feature(
+            license_mgr, "community_warnings", show_message=False
+        )
+
+        # Handle multiple packages: take the best match for each name, pass it
+        # through the conflict check, and install the rest together so
+        # independent builds overlap
         if len(packages) > 1:
-            console.print(f"\n[bold cyan]📦 Installing {len(packages)} packages:[/bold cyan]")
+            selected_packages = []
+            selected_keys = set()
+            failed_packages = []
             for pkg in packages:
-                console.print(f"  • {pkg}")
+                with Progress(
+                    SpinnerColumn(),
+                    TextColumn("[progress.description]{task.description}"),
+                    console=console
+                ) as progress:
+                    task = progress.add_task(f"🔎 Searching for '{pkg}'...", total=None)
+                    results = searcher.search_all(pkg)
+                    progress.update(task, completed=True)
+                
+                if not results:
+                    failed_packages.append(pkg)
+                    console.print(f"[red]❌ No packages found for '{pkg}'[/red]")
+                    continue
+                
+                ranked_results = searcher.rank_results(results, pkg)
+                if use_recommendations:
+                    console.print(f"\n[yellow]🤖 Analyzing results for '{pkg}'...[/yellow]")
+                    top_package = llm.rank_and_recommend(pkg, ranked_results[:20], profile, check_community=True)[0][0]
+                else:
+                    top_package = ranked_results[0]
+                
+                key = (top_package.manager, top_package.name)
+                if key in selected_keys:
+                    console.print(f"[dim]'{pkg}' resolves to {top_package.name} ({top_package.manager}), already selected[/dim]")
+                    continue
+                
+                conflicts = oracle.check_conflicts(
+                    top_package.name,
+                    frozenset(profile.installed_packages),
+                    system_info
+                )
+                if conflicts:
+                    resolution = oracle.display_conflicts(conflicts)
+                    if resolution and "cancel" in resolution.lower():
+                        console.print(f"[yellow]Skipping {top_package.name} due to conflicts[/yellow]")
+                        failed_packages.append(pkg)
+                        continue
+                    elif resolution and "remove" in resolution.lower():
+                        console.print(f"\n[yellow]💡 Conflict resolution recommended. Handle manually or use suggested commands.[/yellow]")
+                
+                selected_keys.add(key)
+                selected_packages.append(top_package)
+            
+            if not selected_packages:
+                sys.exit(1)
+            
+            console.print(f"\n[bold cyan]📦 Installing {len(selected_packages)} packages:[/bold cyan]")
+            for pkg in selected_packages:
+                console.print(f"  • {pkg.name} ({pkg.manager})")
             console.print()
             
-            if not yes and not Confirm.ask(f"\nInstall all {len(packages)} packages?"):
+            if not yes and not Confirm.ask(f"\nInstall all {len(selected_packages)} packages?"):
                 console.print("[yellow]Installation cancelled[/yellow]")
                 sys.exit(0)
             
-            # Install each package
-            success_count = 0
-            failed_packages = []
+            installer = PackageInstaller(config, llm, profile)
+            install_results = installer.install_many(selected_packages, auto_confirm=yes)
             
-            for i, pkg in enumerate(packages, 1):
-                console.print(f"\n[bold cyan]═══ Package {i}/{len(packages)}: {pkg} ═══[/bold cyan]\n")
-                
-                try:
-                    # Recursive call for each package
-                    subprocess.run(
-                        ["eshu", "install", pkg] + (["--yes"] if yes else []) + (["--fast"] if fast else []),
-                        check=True
+            for pkg, success in zip(selected_packages, install_results):
+                analytics.track_installation(
+                    package_name=pkg.name,
+                    package_manager=pkg.manager,
+                    distro=profile.distro,
+                    distro_version=profile.distro_version,
+                    success=success
+                )
+                analytics.track_manager_usage(
+                    package_manager=pkg.manager,
+                    operation="install",
+                    success=success
+                )
+                if success:
+                    installer.verify_installation(pkg)
+                else:
+                    analytics.track_error(
+                        package_name=pkg.name,
+                        package_manager=pkg.manager,
+                        distro=profile.distro,
+                        error_type="install_failure",
+                        error_message="Installation command failed"
                     )
-                    success_count += 1
-                except subprocess.CalledProcessError:
-                    failed_packages.append(pkg)
-                    console.print(f"[red]✗ Failed to install {pkg}[/red]")
-                    if not Confirm.ask("Continue with remaining packages?", default=True):
-                        break
+                    failed_packages.append(f"{pkg.name} ({pkg.manager})")
             
             # Summary
+            success_count = sum(install_results)
+            attempted = success_count + len(failed_packages)
             console.print(f"\n[bold cyan]═══ Installation Summary ═══[/bold cyan]")
-            console.print(f"[green]✓ Successful:[/green] {success_count}/{len(packages)}")
+            console.print(f"[green]✓ Successful:[/green] {success_count}/{attempted}")
             if failed_packages:
                 console.print(f"[red]✗ Failed:[/red] {', '.join(failed_packages)}")
             
@@ -656,29 +731,25 @@ def install(
         ranked_results = searcher.rank_results(all_results, query)
         
         # Get LLM recommendations (if available and premium) - silently check
-        if can_use_llm and check_license_feature(license_mgr, "community_warnings", show_message=False):
+        if use_recommendations:
             console.print("\n[yellow]🤖 Analyzing results and checking for known issues...[/yellow]")
-            recommended_results = llm.rank_and_recommend(query, ranked_results[:20], profile, check_community=True)
+            recommended_results = llm.rank_and_recommend(
+                query,
+                ranked_results[:20],
+                profile,
+                check_community=True,
+                on_recommended=lambda r: console.print(f"[dim]Best match: {r.name} ({r.manager}), finishing analysis...[/dim]")
+            )
         else:
             recommended_results = [(r, None) for r in ranked_results[:20]]
 
-        # Check for conflicts (Conflict Oracle)
-        from .conflict_oracle import ConflictOracle
-
-        oracle = ConflictOracle(config.cache_dir, license.tier)
-
-        # Check conflicts for top result
+        # Check for conflicts (Conflict Oracle) for top result
         if recommended_results:
             top_package = recommended_results[0][0]
-            system_info = {
-                "gpu": getattr(profile, "gpu", ""),
-                "session_type": getattr(profile, "session_type", ""),
-                "kernel": getattr(profile, "kernel_version", "")
-            }
 
             conflicts = oracle.check_conflicts(
                 top_package.name,
-                profile.installed_packages,
+                frozenset(profile.installed_packages),
                 system_info
             )
 
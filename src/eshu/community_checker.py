@@ -2,11 +2,112 @@
 
 import subprocess
 import re
-from typing import List, Dict, Optional
+from pathlib import Path
+from typing import List, Dict, Mapping, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
 
+# Wayland compositors known to misbehave on NVIDIA hardware
+_WAYLAND_COMPOSITORS = frozenset({
+    "hyprland", "sway", "wayfire", "river", "niri", "cosmic-comp"
+})
+
+_MESA_GPUS = frozenset({"amd", "intel"})
+_MESA_PACKAGES = frozenset({"mesa", "mesa-git"})
+_NVIDIA_PACKAGES = frozenset({"nvidia", "nvidia-dkms"})
+
+# Lightweight alternatives for low-end hardware, matched by substring
+_LIGHTWEIGHT_ALTS: Mapping[str, Tuple[Mapping[str, str], ...]] = {
+    "libreoffice": (
+        {"name": "abiword", "reason": "Lightweight word processor"},
+        {"name": "gnumeric", "reason": "Lightweight spreadsheet"},
+    ),
+    "firefox": (
+        {"name": "firefox-esr", "reason": "More stable, less resource-intensive"},
+        {"name": "chromium", "reason": "Alternative browser"},
+    ),
+    "thunderbird": (
+        {"name": "geary", "reason": "Lightweight email client"},
+        {"name": "claws-mail", "reason": "Very lightweight email client"},
+    ),
+    "gimp": (
+        {"name": "krita", "reason": "Lighter for digital painting"},
+        {"name": "pinta", "reason": "Very lightweight image editor"},
+    ),
+}
+
+# Known issues database (lightweight, no external dependencies)
+_KNOWN_ISSUES = {
+    "nvidia": {
+        "affected_hardware": frozenset({"nvidia"}),
+        "issues": [
+            {
+                "severity": "warning",
+                "title": "NVIDIA driver compatibility",
+                "description": "Some NVIDIA driver versions have issues with Wayland compositors",
+                "workaround": "Use X11 session or wait for driver update"
+            }
+        ]
+    },
+    "hyprland": {
+        "affected_hardware": frozenset({"nvidia"}),
+        "issues": [
+            {
+                "severity": "warning",
+                "title": "Hyprland + NVIDIA issues",
+                "description": "Hyprland may have flickering or crashes on NVIDIA GPUs",
+                "workaround": "Enable nvidia-drm.modeset=1 in kernel parameters"
+            }
+        ]
+    },
+    "wayland": {
+        "affected_hardware": frozenset({"nvidia"}),
+        "issues": [
+            {
+                "severity": "info",
+                "title": "Wayland on NVIDIA",
+                "description": "Wayland support on NVIDIA requires driver version 495+",
+                "workaround": "Ensure you have the latest NVIDIA drivers"
+            }
+        ]
+    },
+    "mesa": {
+        "affected_hardware": frozenset({"amd", "intel"}),
+        "issues": [
+            {
+                "severity": "info",
+                "title": "Mesa updates",
+                "description": "Mesa updates can occasionally cause temporary graphics issues",
+                "workaround": "Keep a backup kernel/driver version"
+            }
+        ]
+    },
+    "wine": {
+        "affected_hardware": frozenset({"nvidia"}),
+        "issues": [
+            {
+                "severity": "info",
+                "title": "Wine + NVIDIA",
+                "description": "Some games may require nvidia-utils-beta for best performance",
+                "workaround": "Install nvidia-utils-beta if experiencing issues"
+            }
+        ]
+    }
+}
+
+# ID= line of /etc/os-release, with optional quoting
+_OS_RELEASE_ID = re.compile(rb'^ID=["\']?([^"\'\n]+)', re.M)
+
+# Every 2-gram that occurs in a known-issue pattern. A name sharing none of
+# these cannot contain any pattern, so most lookups skip the table entirely.
+_PATTERN_BIGRAMS = frozenset(
+    pattern[i:i + 2]
+    for pattern in _KNOWN_ISSUES
+    for i in range(len(pattern) - 1)
+)
+
+
 @dataclass
 class CommunityWarning:
     """Represents a community-reported issue"""
@@ -25,6 +126,10 @@ class CommunityChecker:
     
     def __init__(self):
         self.hardware_info = self._detect_hardware()
+        self._user_hw = frozenset(
+            self.hardware_info[key] for key in ("gpu", "cpu")
+            if self.hardware_info[key] != "unknown"
+        )
     
     def _detect_hardware(self) -> Dict[str, str]:
         """Detect system hardware"""
@@ -68,11 +173,9 @@ class CommunityChecker:
         
         # Detect distro
         try:
-            with open("/etc/os-release") as f:
-                for line in f:
-                    if line.startswith("ID="):
-                        info["distro"] = line.split("=")[1].strip().strip('"')
-                        break
+            match = _OS_RELEASE_ID.search(Path("/etc/os-release").read_bytes())
+            if match:
+                info["distro"] = match.group(1).strip().decode()
         except Exception:
             pass
         
@@ -105,84 +208,23 @@ class CommunityChecker:
         """Check built-in database of known issues"""
         warnings = []
         
-        # Known issues database (lightweight, no external dependencies)
-        known_issues = {
-            "nvidia": {
-                "affected_hardware": ["nvidia"],
-                "issues": [
-                    {
-                        "severity": "warning",
-                        "title": "NVIDIA driver compatibility",
-                        "description": "Some NVIDIA driver versions have issues with Wayland compositors",
-                        "workaround": "Use X11 session or wait for driver update"
-                    }
-                ]
-            },
-            "hyprland": {
-                "affected_hardware": ["nvidia"],
-                "issues": [
-                    {
-                        "severity": "warning",
-                        "title": "Hyprland + NVIDIA issues",
-                        "description": "Hyprland may have flickering or crashes on NVIDIA GPUs",
-                        "workaround": "Enable nvidia-drm.modeset=1 in kernel parameters"
-                    }
-                ]
-            },
-            "wayland": {
-                "affected_hardware": ["nvidia"],
-                "issues": [
-                    {
-                        "severity": "info",
-                        "title": "Wayland on NVIDIA",
-                        "description": "Wayland support on NVIDIA requires driver version 495+",
-                        "workaround": "Ensure you have the latest NVIDIA drivers"
-                    }
-                ]
-            },
-            "mesa": {
-                "affected_hardware": ["amd", "intel"],
-                "issues": [
-                    {
-                        "severity": "info",
-                        "title": "Mesa updates",
-                        "description": "Mesa updates can occasionally cause temporary graphics issues",
-                        "workaround": "Keep a backup kernel/driver version"
-                    }
-                ]
-            },
-            "wine": {
-                "affected_hardware": ["nvidia"],
-                "issues": [
-                    {
-                        "severity": "info",
-                        "title": "Wine + NVIDIA",
-                        "description": "Some games may require nvidia-utils-beta for best performance",
-                        "workaround": "Install nvidia-utils-beta if experiencing issues"
-                    }
-                ]
-            }
-        }
+        name = package_name.lower()
+        if not any(name[i:i + 2] in _PATTERN_BIGRAMS for i in range(len(name) - 1)):
+            return warnings
         
         # Check if package matches any known issues
-        for pkg_pattern, issue_data in known_issues.items():
-            if pkg_pattern.lower() in package_name.lower():
+        for pkg_pattern, issue_data in _KNOWN_ISSUES.items():
+            if pkg_pattern in name:
                 # Check if user's hardware is affected
-                affected_hw = issue_data.get("affected_hardware", [])
-                
-                is_affected = False
-                for hw in affected_hw:
-                    if hw == self.hardware_info["gpu"] or hw == self.hardware_info["cpu"]:
-                        is_affected = True
-                        break
+                affected_hw = issue_data.get("affected_hardware", frozenset())
                 
-                if is_affected or not affected_hw:
+                if not affected_hw or affected_hw & self._user_hw:
                     for issue in issue_data.get("issues", []):
                         warnings.append(CommunityWarning(
                             severity=issue["severity"],
                             title=issue["title"],
                             description=issue["description"],
-                            affected_hardware=affected_hw,
+                            affected_hardware=sorted(affected_hw),
                             affected_distros=[],
                             workaround=issue.get("workaround"),
                             source="known_issues"
@@ -202,6 +244,7 @@ class CommunityChecker:
     
     def check_system_compatibility(self, package_name: str) -> Dict[str, any]:
         """Check if package is compatible with current system"""
+        name = package_name.lower()
         compatibility = {
             "compatible": True,
             "warnings": [],
@@ -209,7 +252,7 @@ class CommunityChecker:
         }
         
         # Check for known incompatibilities
-        if package_name.lower() in ["hyprland", "sway", "wayfire"]:
+        if name in _WAYLAND_COMPOSITORS:
             if self.hardware_info["gpu"] == "nvidia":
                 compatibility["warnings"].append(
                     "Wayland compositors may have issues on NVIDIA hardware"
@@ -218,14 +261,14 @@ class CommunityChecker:
                     "Consider using X11-based desktop environment or ensure nvidia-drm.modeset=1"
                 )
         
-        if "cuda" in package_name.lower():
+        if "cuda" in name:
             if self.hardware_info["gpu"] != "nvidia":
                 compatibility["compatible"] = False
                 compatibility["warnings"].append(
                     "CUDA requires NVIDIA GPU"
                 )
         
-        if "rocm" in package_name.lower():
+        if "rocm" in name:
             if self.hardware_info["gpu"] != "amd":
                 compatibility["compatible"] = False
                 compatibility["warnings"].append(
@@ -244,43 +287,25 @@ class CommunityChecker:
         
         # Hardware-specific alternatives
         if self.hardware_info["gpu"] == "nvidia":
-            if package_name in ["mesa", "mesa-git"]:
+            if package_name in _MESA_PACKAGES:
                 alternatives.append({
                     "name": "nvidia",
                     "reason": "NVIDIA proprietary driver recommended for NVIDIA GPUs"
                 })
         
-        if self.hardware_info["gpu"] in ["amd", "intel"]:
-            if package_name in ["nvidia", "nvidia-dkms"]:
+        if self.hardware_info["gpu"] in _MESA_GPUS:
+            if package_name in _NVIDIA_PACKAGES:
                 alternatives.append({
                     "name": "mesa",
                     "reason": "Mesa is the correct driver for AMD/Intel GPUs"
                 })
         
-        # Lightweight alternatives for low-end hardware
-        lightweight_alternatives = {
-            "libreoffice": [
-                {"name": "abiword", "reason": "Lightweight word processor"},
-                {"name": "gnumeric", "reason": "Lightweight spreadsheet"}
-            ],
-            "firefox": [
-                {"name": "firefox-esr", "reason": "More stable, less resource-intensive"},
-                {"name": "chromium", "reason": "Alternative browser"}
-            ],
-            "thunderbird": [
-                {"name": "geary", "reason": "Lightweight email client"},
-                {"name": "claws-mail", "reason": "Very lightweight email client"}
-            ],
-            "gimp": [
-                {"name": "krita", "reason": "Lighter for digital painting"},
-                {"name": "pinta", "reason": "Very lightweight image editor"}
-            ]
-        }
-        
         if reason == "lightweight":
-            for pkg, alts in lightweight_alternatives.items():
-                if pkg in package_name.lower():
-                    alternatives.extend(alts)
+            name_lc = package_name.lower()
+            for pkg, alts in _LIGHTWEIGHT_ALTS.items():
+                if pkg in name_lc:
+                    # Copy so callers can't mutate the shared table
+                    alternatives.extend(dict(alt) for alt in alts)
         
         return alternatives
     
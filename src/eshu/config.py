@@ -3,12 +3,23 @@
 import json
 import os
 from pathlib import Path
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
 
 
 class ESHUConfig(BaseModel):
-    """ESHU configuration model"""
+    """ESHU configuration model
+    
+    Instances are immutable (and therefore hashable); use
+    ``config.model_copy(update={...})`` to derive a changed config.
+    """
+    
+    model_config = ConfigDict(frozen=True, populate_by_name=True)
     
     # LLM Provider settings
     llm_provider: str = Field(default="anthropic", description="LLM provider: anthropic, openai, or ollama")
@@ -21,10 +32,20 @@ class ESHUConfig(BaseModel):
     model_name: str = Field(default="claude-3-5-sonnet-20241022", description="Model to use")
     temperature: float = Field(default=0.3, description="LLM temperature")
     max_tokens: int = Field(default=4096, description="Max tokens for response")
+
+    # LLM response cache (only used when sampling is close to deterministic)
+    llm_cache_enabled: bool = Field(default=True, description="Reuse responses to identical LLM requests")
+    llm_cache_max_temperature: float = Field(
+        default=0.0,
+        description="Highest temperature at which LLM responses are cached"
+    )
+    llm_cache_ttl: int = Field(default=86400, description="LLM response cache TTL in seconds")
+    max_concurrent_llm: int = Field(default=4, description="Max LLM requests in flight at once")
+    max_error_chars: int = Field(default=2000, description="Characters of failed command output sent for error analysis")
     
     # Package manager preferences (priority order)
-    package_manager_priority: list[str] = Field(
-        default=["pacman", "yay", "paru", "apt", "flatpak", "snap", "cargo", "npm", "pip", "aur"],
+    package_manager_priority: Tuple[str, ...] = Field(
+        default=("pacman", "yay", "paru", "apt", "flatpak", "snap", "cargo", "npm", "pip", "aur"),
         description="Priority order for package managers"
     )
     default_package_manager: Optional[str] = Field(
@@ -57,9 +78,6 @@ class ESHUConfig(BaseModel):
     # Build settings
     build_dir: Path = Field(default=Path("/tmp/eshu-builds"), description="Temporary build directory")
     parallel_jobs: int = Field(default=0, description="Parallel build jobs (0=auto)")
-    
-    class Config:
-        env_prefix = "ESHU_"
 
 
 def get_config_path() -> Path:
@@ -79,15 +97,15 @@ def load_config() -> ESHUConfig:
             return ESHUConfig(**data)
     
     # Try to load from environment
-    config = ESHUConfig()
+    overrides = {}
     
     # Check for API keys in environment
     if api_key := os.getenv("ANTHROPIC_API_KEY"):
-        config.anthropic_api_key = api_key
+        overrides["anthropic_api_key"] = api_key
     if api_key := os.getenv("OPENAI_API_KEY"):
-        config.openai_api_key = api_key
+        overrides["openai_api_key"] = api_key
     
-    return config
+    return ESHUConfig(**overrides)
 
 
 def save_config(config: ESHUConfig) -> None:
@@ -95,5 +113,14 @@ def save_config(config: ESHUConfig) -> None:
     config_path = get_config_path()
     config_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(config_path, 'w') as f:
-        json.dump(config.model_dump(), f, indent=2, default=str)
+    data = config.model_dump(mode="json")
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2).encode()
+    
+    # Write to a sibling file and rename so an interrupted save never
+    # leaves a truncated config behind
+    tmp_path = config_path.with_suffix(".json.tmp")
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, config_path)
@@ -18,18 +18,84 @@ Premium features:
 - AI conflict predictions
 """
 
+import atexit
+import os
 import subprocess
 import json
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
-from dataclasses import dataclass, asdict
-from datetime import datetime
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.prompt import Prompt, Confirm
+from typing import AbstractSet, Dict, FrozenSet, List, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timezone
 
-console = Console()
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
+
+# Minimum seconds between resolution history writes; the rest happen at exit
+HISTORY_FLUSH_INTERVAL = 5.0
+
+# pacman's local package database; its mtime changes on install/remove
+PACMAN_LOCAL_DB = Path("/var/lib/pacman/local")
+
+# check_conflicts results kept per ConflictOracle instance
+CONFLICT_CACHE_SIZE = 256
+
+# Parallel pacman queries used to build the file-owner index
+FILE_INDEX_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _json_loads(data: bytes):
+    """Parse JSON, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj, pretty: bool = False) -> bytes:
+    """Serialize to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+    return json.dumps(obj, indent=2 if pretty else None).encode()
+
+
+# Resolution records not yet on disk, by history log path. Shared by every
+# ConflictOracle so one exit handler writes them all
+_PENDING_RESOLUTIONS: Dict[Path, List[Dict]] = {}
+_last_history_flush = time.monotonic()
+
+
+def _append_resolutions(path: Path, records: List[Dict]):
+    """Append resolution records to a history log"""
+    try:
+        with open(path, 'ab') as f:
+            f.write(b"".join(_json_dumps(record) + b"\n" for record in records))
+    except Exception:
+        pass
+
+
+def _flush_resolutions():
+    """Write every pending resolution record"""
+    global _last_history_flush
+    for path, records in _PENDING_RESOLUTIONS.items():
+        _append_resolutions(path, records)
+    _PENDING_RESOLUTIONS.clear()
+    _last_history_flush = time.monotonic()
+
+
+atexit.register(_flush_resolutions)
+
+
+@lru_cache(maxsize=None)
+def _command_exists(command: str) -> bool:
+    """Check PATH for a command once per process"""
+    return shutil.which(command) is not None
 
 
 @dataclass
@@ -48,7 +114,7 @@ class PackageConflict:
 
 @dataclass
 class ConflictResolution:
-    """Tracks how conflicts were resolved"""
+    """Tracks how conflicts were resolved (the shape of resolution history records)"""
     package_name: str
     conflict_type: str
     resolution_chosen: str
@@ -56,8 +122,39 @@ class ConflictResolution:
     timestamp: str
 
 
+@dataclass(frozen=True)
+class VersionSpec:
+    """A package requirement such as "nvidia<470", split at load time"""
+    name: str
+    operator: Optional[str] = None
+    version: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class KnownConflict:
+    """An entry of the known conflicts database"""
+    description: str
+    resolution_options: Tuple[str, ...]
+    recommended: int
+    severity: str
+    conflicts_with: Tuple[VersionSpec, ...] = ()
+    warns_with: Tuple[VersionSpec, ...] = ()
+    community_votes: int = 0
+
+
+_VERSION_OPERATOR = re.compile(r"[<>=]+")
+
+
+def _parse_version_spec(spec: str) -> VersionSpec:
+    """Split "name<op><version>" into its parts"""
+    match = _VERSION_OPERATOR.search(spec)
+    if match is None:
+        return VersionSpec(spec)
+    return VersionSpec(spec[:match.start()], match.group(), spec[match.end():])
+
+
 # Known conflicts database (hardcoded core conflicts + will be crowdsourced)
-KNOWN_CONFLICTS = {
+_KNOWN_CONFLICTS_SOURCE = {
     "wine-staging": {
         "conflicts_with": ["wine"],
         "description": "wine-staging and wine provide the same files",
@@ -120,6 +217,46 @@ KNOWN_CONFLICTS = {
     },
 }
 
+KNOWN_CONFLICTS: Dict[str, KnownConflict] = {
+    pkg: KnownConflict(
+        description=info["description"],
+        resolution_options=tuple(info["resolution_options"]),
+        recommended=info["recommended"],
+        severity=info["severity"],
+        conflicts_with=tuple(map(_parse_version_spec, info.get("conflicts_with", []))),
+        warns_with=tuple(map(_parse_version_spec, info.get("warns_with", []))),
+        community_votes=info.get("community_votes", 0),
+    )
+    for pkg, info in _KNOWN_CONFLICTS_SOURCE.items()
+}
+
+# Name fragments of packages that clash with the system, by kind of clash.
+# Each kind is compiled into one alternation so a name is scanned once per kind.
+SYSTEM_CONFLICT_TOKENS = {
+    "nvidia_incompatible": ("nouveau", "xf86-video-nouveau"),
+    "x11_only": ("xorg", "xf86"),
+}
+
+_SYSTEM_CONFLICT_PATTERNS = {
+    tag: re.compile("|".join(map(re.escape, tokens)))
+    for tag, tokens in SYSTEM_CONFLICT_TOKENS.items()
+}
+
+def _index_installed(installed_packages: FrozenSet[str]) -> Dict[str, FrozenSet[str]]:
+    """Index installed package names by their lowercase dash-separated parts
+
+    "lib32-nvidia-utils" is reachable under "lib32", "nvidia" and "utils"
+    (and its full name), so a package family can be found with one lookup.
+    """
+
+    index: Dict[str, set] = {}
+    for name in installed_packages:
+        name_lower = name.lower()
+        index.setdefault(name_lower, set()).add(name_lower)
+        for part in name_lower.split('-'):
+            index.setdefault(part, set()).add(name_lower)
+    return {key: frozenset(names) for key, names in index.items()}
+
 
 class ConflictOracle:
     """Detects and resolves package conflicts before installation"""
@@ -128,18 +265,43 @@ class ConflictOracle:
         self.cache_dir = cache_dir
         self.license_tier = license_tier
         self.conflict_db_path = cache_dir / "conflict_database.json"
-        self.resolution_log_path = cache_dir / "conflict_resolutions.json"
+        # One JSON record per line, appended as resolutions are logged
+        self.resolution_log_path = cache_dir / "conflict_resolutions.ndjson"
 
         # Load conflict database
         self.conflict_db = self._load_conflict_db()
 
-        # Load resolution history
+        # Load resolution history; new records are flushed in batches, and
+        # whatever is pending at exit by _flush_resolutions
         self.resolution_history = self._load_resolution_history()
 
+        # File data from `pacman -Ql`, valid while the local DB is unchanged
+        self._file_index: Dict[str, frozenset] = {}
+        self._file_owner: Optional[Dict[bytes, str]] = None
+        self._file_index_mtime: Optional[float] = None
+
+        # check_conflicts results, keyed on the inputs the checks actually read
+        self._conflict_cache: Dict[tuple, List[PackageConflict]] = {}
+
+        # Index of the most recently seen installed package set
+        self._installed_key: Optional[frozenset] = None
+        self._installed_index: Dict[str, FrozenSet[str]] = {}
+
+        # rich is only needed for interactive display, created on first use
+        self._console = None
+
+        # The file-owner index is only used by the premium file check; start
+        # building it now so it is ready by the time a check runs
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._sync_file_caches()
+        if self.license_tier in ["premium", "trial"] and self._has_command("pacman"):
+            self._warmup_thread = threading.Thread(target=self._warm_file_index, daemon=True)
+            self._warmup_thread.start()
+
     def check_conflicts(
         self,
         package_name: str,
-        installed_packages: Set[str],
+        installed_packages: AbstractSet[str],
         system_info: Dict
     ) -> List[PackageConflict]:
         """
@@ -147,78 +309,111 @@ class ConflictOracle:
 
         Args:
             package_name: Package to check
-            installed_packages: Currently installed packages
+            installed_packages: Currently installed packages; pass a frozenset
+                to avoid a copy (the set is also the memo key)
             system_info: System information (distro, kernel, DE, GPU, etc.)
 
         Returns:
             List of detected conflicts
         """
 
+        pkg_base = package_name.split('-')[0].lower()
+        premium = self.license_tier in ["premium", "trial"]
+
+        # Free tier only has the built-in known conflicts (the dependency check
+        # is still a stub), so most packages can be answered right here
+        if not premium and pkg_base not in KNOWN_CONFLICTS:
+            return []
+
+        # Results stay valid until the installed package database changes
+        self._sync_file_caches()
+        # frozenset() of a frozenset is the same object, so callers that
+        # already hold one pay nothing here
+        installed_key = frozenset(installed_packages)
+        cache_key = (
+            package_name,
+            installed_key,
+            system_info.get("gpu", ""),
+            system_info.get("session_type", ""),
+        )
+        if cache_key in self._conflict_cache:
+            return list(self._conflict_cache[cache_key])
+
         conflicts = []
 
+        # Normalize installed names once per installed set, not once per check
+        if installed_key != self._installed_key:
+            self._installed_index = _index_installed(installed_key)
+            self._installed_key = installed_key
+        installed_index = self._installed_index
+
         # 1. Check known conflicts
-        conflicts.extend(self._check_known_conflicts(package_name, installed_packages))
+        conflicts.extend(self._check_known_conflicts(package_name, pkg_base, installed_index))
 
         # 2. Check file conflicts (Premium)
-        if self.license_tier in ["premium", "trial"]:
-            conflicts.extend(self._check_file_conflicts(package_name, installed_packages))
+        if premium:
+            conflicts.extend(self._check_file_conflicts(package_name, installed_key))
 
         # 3. Check dependency conflicts
         conflicts.extend(self._check_dependency_conflicts(package_name))
 
         # 4. Check system compatibility (Premium)
-        if self.license_tier in ["premium", "trial"]:
+        if premium:
             conflicts.extend(self._check_system_compatibility(package_name, system_info))
 
-        return conflicts
+        if len(self._conflict_cache) >= CONFLICT_CACHE_SIZE:
+            # Evict the oldest entry
+            del self._conflict_cache[next(iter(self._conflict_cache))]
+        self._conflict_cache[cache_key] = conflicts
+
+        return list(conflicts)
 
     def _check_known_conflicts(
         self,
         package_name: str,
-        installed_packages: Set[str]
+        pkg_base: str,
+        installed_index: Dict[str, FrozenSet[str]]
     ) -> List[PackageConflict]:
-        """Check against known conflict database"""
+        """Check against known conflict database
 
-        conflicts = []
+        Args:
+            package_name: Package to check
+            pkg_base: Normalized package name (lowercase, before the first dash)
+            installed_index: Installed packages as built by _index_installed
+        """
 
-        # Normalize package name
-        pkg_base = package_name.split('-')[0].lower()
+        conflicts = []
 
         # Check if package is in known conflicts
         if pkg_base in KNOWN_CONFLICTS:
-            conflict_info = KNOWN_CONFLICTS[pkg_base]
+            known = KNOWN_CONFLICTS[pkg_base]
 
             # Check if conflicts with installed packages
-            for conflict_pkg in conflict_info.get("conflicts_with", []):
-                # Handle version specifiers like "nvidia<470"
-                conflict_base = conflict_pkg.split('<')[0].split('>')[0].split('=')[0]
-
-                if any(conflict_base in installed.lower() for installed in installed_packages):
+            for spec in known.conflicts_with:
+                if spec.name in installed_index:
                     conflicts.append(PackageConflict(
                         conflict_type="known",
-                        severity=conflict_info["severity"],
+                        severity=known.severity,
                         conflicting_package=package_name,
-                        installed_package=conflict_base,
-                        description=conflict_info["description"],
-                        resolution_options=conflict_info["resolution_options"],
-                        recommended_option=conflict_info["recommended"],
-                        community_votes=conflict_info.get("community_votes", 0)
+                        installed_package=spec.name,
+                        description=known.description,
+                        resolution_options=list(known.resolution_options),
+                        recommended_option=known.recommended,
+                        community_votes=known.community_votes
                     ))
 
             # Check warnings
-            for warn_pkg in conflict_info.get("warns_with", []):
-                warn_base = warn_pkg.split('<')[0].split('>')[0].split('=')[0]
-
-                if any(warn_base in installed.lower() for installed in installed_packages):
+            for spec in known.warns_with:
+                if spec.name in installed_index:
                     conflicts.append(PackageConflict(
                         conflict_type="known",
                         severity="warning",
                         conflicting_package=package_name,
-                        installed_package=warn_base,
-                        description=conflict_info["description"],
-                        resolution_options=conflict_info["resolution_options"],
-                        recommended_option=conflict_info["recommended"],
-                        community_votes=conflict_info.get("community_votes", 0)
+                        installed_package=spec.name,
+                        description=known.description,
+                        resolution_options=list(known.resolution_options),
+                        recommended_option=known.recommended,
+                        community_votes=known.community_votes
                     ))
 
         # Check crowdsourced conflicts (Premium)
@@ -232,7 +427,7 @@ class ConflictOracle:
     def _check_file_conflicts(
         self,
         package_name: str,
-        installed_packages: Set[str]
+        installed_packages: FrozenSet[str]
     ) -> List[PackageConflict]:
         """Check if package will overwrite files from installed packages"""
 
@@ -242,60 +437,134 @@ class ConflictOracle:
             # Get list of files the package will install (distro-specific)
             # For Arch/pacman
             if self._has_command("pacman"):
-                result = subprocess.run(
-                    ["pacman", "-Ql", package_name],
-                    capture_output=True,
-                    text=True,
-                    check=False
-                )
-
-                if result.returncode == 0:
-                    package_files = set()
-                    for line in result.stdout.split('\n'):
-                        if line:
-                            parts = line.split()
-                            if len(parts) >= 2:
-                                package_files.add(parts[1])
-
-                    # Check against installed packages
-                    for installed_pkg in installed_packages:
-                        result = subprocess.run(
-                            ["pacman", "-Ql", installed_pkg],
-                            capture_output=True,
-                            text=True,
-                            check=False
-                        )
-
-                        if result.returncode == 0:
-                            installed_files = set()
-                            for line in result.stdout.split('\n'):
-                                if line:
-                                    parts = line.split()
-                                    if len(parts) >= 2:
-                                        installed_files.add(parts[1])
-
-                            # Find overlapping files
-                            overlap = package_files & installed_files
-                            if overlap and len(overlap) > 1:  # Ignore single file overlaps
-                                conflicts.append(PackageConflict(
-                                    conflict_type="file",
-                                    severity="critical",
-                                    conflicting_package=package_name,
-                                    installed_package=installed_pkg,
-                                    description=f"{len(overlap)} file conflicts detected",
-                                    resolution_options=[
-                                        f"Remove {installed_pkg} first",
-                                        "Force install (may break system)",
-                                        "Cancel installation"
-                                    ],
-                                    recommended_option=0
-                                ))
+                package_files = self._pacman_files(package_name)
+
+                if package_files:
+                    # Count how many of the package's files each installed package owns
+                    file_owner = self._file_owners()
+                    overlap_counts: Dict[str, int] = {}
+                    for path in package_files:
+                        owner = file_owner.get(path)
+                        if owner and owner != package_name and owner in installed_packages:
+                            overlap_counts[owner] = overlap_counts.get(owner, 0) + 1
+
+                    for installed_pkg, overlap in overlap_counts.items():
+                        if overlap > 1:  # Ignore single file overlaps
+                            conflicts.append(PackageConflict(
+                                conflict_type="file",
+                                severity="critical",
+                                conflicting_package=package_name,
+                                installed_package=installed_pkg,
+                                description=f"{overlap} file conflicts detected",
+                                resolution_options=[
+                                    f"Remove {installed_pkg} first",
+                                    "Force install (may break system)",
+                                    "Cancel installation"
+                                ],
+                                recommended_option=0
+                            ))
 
         except Exception:
             pass  # Silently fail if we can't check
 
         return conflicts
 
+    def _warm_file_index(self):
+        """Build the file-owner index in the background"""
+
+        try:
+            self._file_owners()
+        except Exception:
+            pass  # _check_file_conflicts retries and handles failures itself
+
+    def _sync_file_caches(self):
+        """Drop cached pacman file data and results if the local database changed
+
+        Waits for a running background warmup first, so the caches are never
+        reset while it is still filling them.
+        """
+
+        if self._warmup_thread is not None:
+            self._warmup_thread.join()
+            self._warmup_thread = None
+
+        try:
+            db_mtime = PACMAN_LOCAL_DB.stat().st_mtime
+        except OSError:
+            db_mtime = None
+
+        # Installing or removing anything invalidates all cached file data
+        if db_mtime != self._file_index_mtime:
+            self._file_index.clear()
+            self._file_owner = None
+            self._conflict_cache.clear()
+            self._file_index_mtime = db_mtime
+
+    def _pacman_files(self, package_name: str) -> frozenset:
+        """Get the files owned by an installed package (cached)
+
+        Paths are kept as undecoded bytes; they are only compared, never shown.
+        """
+
+        if package_name not in self._file_index:
+            files = set()
+            for line in self._query_pacman_files([package_name]).splitlines():
+                _, _, path = line.partition(b' ')
+                if path:
+                    files.add(path)
+
+            self._file_index[package_name] = frozenset(files)
+
+        return self._file_index[package_name]
+
+    def _file_owners(self) -> Dict[bytes, str]:
+        """Map every file of every installed package to its owner (cached)
+
+        The installed packages are split into FILE_INDEX_WORKERS batches that
+        are queried concurrently; pacman reads a separate database entry per
+        package, so the batches don't contend. Directories are skipped since
+        they are legitimately shared between packages.
+        """
+
+        if self._file_owner is None:
+            result = subprocess.run(
+                ["pacman", "-Qq"],
+                capture_output=True,
+                text=True,
+                check=False
+            )
+            names = result.stdout.split() if result.returncode == 0 else []
+
+            batch_size = max(1, -(-len(names) // FILE_INDEX_WORKERS))
+            batches = [names[i:i + batch_size] for i in range(0, len(names), batch_size)]
+
+            file_owner = {}
+            owner_names: Dict[bytes, str] = {}  # decode each package name once
+            with ThreadPoolExecutor(max_workers=FILE_INDEX_WORKERS) as executor:
+                for output in executor.map(self._query_pacman_files, batches):
+                    for line in output.splitlines():
+                        owner, _, path = line.partition(b' ')
+                        if path and not path.endswith(b'/'):
+                            name = owner_names.get(owner)
+                            if name is None:
+                                name = owner_names[owner] = owner.decode()
+                            file_owner[path] = name
+
+            self._file_owner = file_owner
+
+        return self._file_owner
+
+    def _query_pacman_files(self, packages: List[str]) -> bytes:
+        """Run `pacman -Ql` for some installed packages and return its raw output"""
+
+        result = subprocess.run(
+            ["pacman", "-Ql", *packages],
+            capture_output=True,
+            check=False
+        )
+        # pacman still lists the packages it found if some are missing
+        return result.stdout
+
     def _check_dependency_conflicts(self, package_name: str) -> List[PackageConflict]:
         """Check for dependency version conflicts"""
 
@@ -315,12 +584,19 @@ class ConflictOracle:
 
         conflicts = []
 
+        name = package_name.lower()
+        tags = {
+            tag for tag, pattern in _SYSTEM_CONFLICT_PATTERNS.items()
+            if pattern.search(name)
+        }
+        if not tags:
+            return conflicts
+
         # GPU-specific conflicts
         gpu = system_info.get("gpu", "").lower()
         if gpu and "nvidia" in gpu:
             # Check for known NVIDIA-incompatible packages
-            nvidia_conflicts = ["nouveau", "xf86-video-nouveau"]
-            if any(pkg in package_name.lower() for pkg in nvidia_conflicts):
+            if "nvidia_incompatible" in tags:
                 conflicts.append(PackageConflict(
                     conflict_type="hardware",
                     severity="critical",
@@ -338,8 +614,7 @@ class ConflictOracle:
         # Wayland/X11 compatibility
         session = system_info.get("session_type", "").lower()
         if session == "wayland":
-            x11_only = ["xorg", "xf86"]
-            if any(pkg in package_name.lower() for pkg in x11_only):
+            if "x11_only" in tags:
                 conflicts.append(PackageConflict(
                     conflict_type="system",
                     severity="warning",
@@ -367,6 +642,15 @@ class ConflictOracle:
         if not conflicts:
             return "proceed"  # No conflicts, proceed
 
+        # Imported here so headless callers of check_conflicts never load rich
+        from rich.console import Console
+        from rich.panel import Panel
+        from rich.prompt import Prompt
+
+        if self._console is None:
+            self._console = Console()
+        console = self._console
+
         console.print("\n[bold red]⚠️  CONFLICTS DETECTED[/bold red]\n")
 
         for i, conflict in enumerate(conflicts, 1):
@@ -420,24 +704,31 @@ class ConflictOracle:
     def _log_resolution(self, conflict: PackageConflict, resolution: str):
         """Log conflict resolution for crowdsourcing (opt-in)"""
 
-        resolution_record = ConflictResolution(
-            package_name=conflict.conflicting_package,
-            conflict_type=conflict.conflict_type,
-            resolution_chosen=resolution,
-            success=False,  # Will be updated later
-            timestamp=datetime.now().isoformat()
-        )
+        # Same fields as ConflictResolution, built directly as a dict
+        record = {
+            "package_name": conflict.conflicting_package,
+            "conflict_type": conflict.conflict_type,
+            "resolution_chosen": resolution,
+            "success": False,  # Will be updated later
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        self.resolution_history.append(record)
+        _PENDING_RESOLUTIONS.setdefault(self.resolution_log_path, []).append(record)
+
+        if time.monotonic() - _last_history_flush > HISTORY_FLUSH_INTERVAL:
+            self.flush_resolution_history()
+
+    def flush_resolution_history(self):
+        """Write pending resolution records to disk"""
 
-        self.resolution_history.append(asdict(resolution_record))
-        self._save_resolution_history()
+        _flush_resolutions()
 
     def _load_conflict_db(self) -> Dict:
         """Load crowdsourced conflict database"""
 
         if self.conflict_db_path.exists():
             try:
-                with open(self.conflict_db_path, 'r') as f:
-                    return json.load(f)
+                return _json_loads(self.conflict_db_path.read_bytes())
             except Exception:
                 pass
 
@@ -446,33 +737,44 @@ class ConflictOracle:
     def _load_resolution_history(self) -> List:
         """Load resolution history"""
 
-        if self.resolution_log_path.exists():
-            try:
-                with open(self.resolution_log_path, 'r') as f:
-                    return json.load(f)
-            except Exception:
-                pass
+        if not self.resolution_log_path.exists():
+            return self._migrate_resolution_history()
 
-        return []
+        history = []
+        try:
+            with open(self.resolution_log_path, 'rb') as f:
+                for line in f:
+                    if line.strip():
+                        try:
+                            history.append(_json_loads(line))
+                        except ValueError:
+                            pass  # Partial line from an interrupted write
+        except Exception:
+            pass
 
-    def _save_resolution_history(self):
-        """Save resolution history"""
+        return history
+
+    def _migrate_resolution_history(self) -> List:
+        """Convert a pre-NDJSON conflict_resolutions.json history, if any"""
+
+        legacy_path = self.cache_dir / "conflict_resolutions.json"
+        if not legacy_path.exists():
+            return []
 
         try:
-            with open(self.resolution_log_path, 'w') as f:
-                json.dump(self.resolution_history, f, indent=2)
+            history = _json_loads(legacy_path.read_bytes())
         except Exception:
-            pass
+            return []
+
+        _append_resolutions(self.resolution_log_path, history)
+        return history
+
+    def export_resolution_history(self, path: Path):
+        """Write resolution history as indented, human-readable JSON"""
+
+        path.write_bytes(_json_dumps(self.resolution_history, pretty=True))
 
     def _has_command(self, command: str) -> bool:
         """Check if a command exists"""
 
-        try:
-            subprocess.run(
-                ["which", command],
-                capture_output=True,
-                check=True
-            )
-            return True
-        except subprocess.CalledProcessError:
-            return False
+        return _command_exists(command)
@@ -1,6 +1,6 @@
 """Eshu's Path - Curated package bundles for complete setups"""
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -200,28 +200,39 @@ ESHU_PATHS: Dict[str, EshuPath] = {
     ),
 }
 
+# Common name variations mapped to their ESHU_PATHS key
+PATH_ALIASES: Dict[str, str] = {
+    "nvidia-driver": "nvidia",
+    "nvidia-proprietary": "nvidia",
+    "nvidia-drivers": "nvidia",
+    "rust-toolchain": "rust-dev",
+    "python3": "python-dev",
+    "steam-gaming": "gaming-linux",
+    "linux-gaming": "gaming-linux",
+}
+
+# Every accepted name (keys and aliases) resolved to its path in one table
+_ESHU_PATH_RESOLVED: Dict[str, EshuPath] = {
+    **ESHU_PATHS,
+    **{alias: ESHU_PATHS[target] for alias, target in PATH_ALIASES.items()},
+}
+
+# Category lookups, built once from ESHU_PATHS
+_PATHS_BY_CATEGORY: Dict[str, List[EshuPath]] = {}
+for _path in ESHU_PATHS.values():
+    _PATHS_BY_CATEGORY.setdefault(_path.category, []).append(_path)
+del _path
+
+_CATEGORIES: Tuple[str, ...] = tuple(_PATHS_BY_CATEGORY)
+
 
 def get_eshu_path(package_name: str) -> Optional[EshuPath]:
-    """Get curated path for a package if available"""
-    # Direct match
-    if package_name.lower() in ESHU_PATHS:
-        return ESHU_PATHS[package_name.lower()]
-
-    # Fuzzy matching for common variations
-    fuzzy_matches = {
-        "nvidia-driver": "nvidia",
-        "nvidia-proprietary": "nvidia",
-        "nvidia-drivers": "nvidia",
-        "rust-toolchain": "rust-dev",
-        "python3": "python-dev",
-        "steam-gaming": "gaming-linux",
-        "linux-gaming": "gaming-linux",
-    }
-
-    if package_name.lower() in fuzzy_matches:
-        return ESHU_PATHS[fuzzy_matches[package_name.lower()]]
+    """Get curated path for a package if available
 
-    return None
+    Matches path keys and PATH_ALIASES case-insensitively; whitespace is
+    treated like a dash, so "nvidia proprietary" finds "nvidia-proprietary".
+    """
+    return _ESHU_PATH_RESOLVED.get("-".join(package_name.lower().split()))
 
 
 def suggest_eshu_path_with_llm(package_name: str, llm_engine, system_profile,
@@ -311,9 +322,9 @@ def suggest_eshu_path_with_llm(package_name: str, llm_engine, system_profile,
 
 def get_all_categories() -> List[str]:
     """Get all available path categories"""
-    return list(set(path.category for path in ESHU_PATHS.values()))
+    return list(_CATEGORIES)
 
 
 def get_paths_by_category(category: str) -> List[EshuPath]:
     """Get all paths in a category"""
-    return [path for path in ESHU_PATHS.values() if path.category == category]
+    return list(_PATHS_BY_CATEGORY.get(category, ()))
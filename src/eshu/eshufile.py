@@ -12,23 +12,73 @@ The magic: Records INTENTS not package names, so it translates across distros:
 Makes system provisioning portable across any Linux distribution!
 """
 
+import hashlib
 import json
-import yaml
+import os
+import pickle
+import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
 from datetime import datetime
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.prompt import Confirm
 import subprocess
+import threading
+from collections import defaultdict
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
 
 from .package_translator import PackageTranslator
 from .system_profiler import SystemProfiler
 
 console = Console()
 
+# Seconds between sudo timestamp refreshes while an Eshufile is applied
+SUDO_REFRESH_INTERVAL = 60
+
+
+def _yaml_load(raw: bytes) -> dict:
+    """Parse YAML, using libyaml when available"""
+    import yaml
+
+    return yaml.load(raw, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+def _yaml_dump(data: dict, path: Path):
+    """Write YAML, using libyaml when available"""
+    import yaml
+
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    with open(path, 'w') as f:
+        yaml.dump(data, f, Dumper=dumper, default_flow_style=False, sort_keys=False)
+
+
+def _json_load(raw: bytes) -> dict:
+    """Parse JSON, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dump(data: dict, path: Path):
+    """Write indented JSON, using orjson when available"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+# File suffix -> (load, dump); anything else is JSON
+_SERIALIZERS = {
+    ".yaml": (_yaml_load, _yaml_dump),
+    ".yml": (_yaml_load, _yaml_dump),
+}
+_DEFAULT_SERIALIZER = (_json_load, _json_dump)
+
 
 @dataclass
 class PackageIntent:
@@ -57,6 +107,17 @@ class EshuFile:
         if self.metadata is None:
             self.metadata = {}
 
+    def to_dict(self) -> dict:
+        """Convert to dictionary (shallow; nested containers are shared)"""
+        return {
+            "version": self.version,
+            "created_at": self.created_at,
+            "created_on_distro": self.created_on_distro,
+            "intents": self.intents,
+            "packages": self.packages,
+            "metadata": self.metadata,
+        }
+
 
 # Intent categories and their common packages
 INTENT_CATEGORIES = {
@@ -138,12 +199,34 @@ INTENT_CATEGORIES = {
     }
 }
 
+# Flat lookup tables for the hot paths; PackageIntent stays the public shape
+# Intent name -> lowercase alternatives, preferred package first
+_ALTS_BY_INTENT: Dict[str, Tuple[str, ...]] = {
+    intent_name: tuple(alt.lower() for alt in intent.alternatives)
+    for intents in INTENT_CATEGORIES.values()
+    for intent_name, intent in intents.items()
+}
+# Intent name -> category
+_CATEGORY_BY_INTENT: Dict[str, str] = {
+    intent_name: category
+    for category, intents in INTENT_CATEGORIES.items()
+    for intent_name in intents
+}
+# Lowercase alternative -> intent name, first definition wins
+_ALT_INDEX: Dict[str, str] = {}
+for _intent_name, _alts in _ALTS_BY_INTENT.items():
+    for _alt in _alts:
+        _ALT_INDEX.setdefault(_alt, _intent_name)
+del _intent_name, _alts, _alt
+
 
 class EshuFileManager:
     """Manages Eshufile creation and application"""
 
     def __init__(self, cache_dir: Path):
         self.cache_dir = cache_dir
+        # Parsed Eshufiles, keyed by a hash of the file contents
+        self.parsed_cache_dir = cache_dir / "eshufile-cache"
         self.translator = PackageTranslator()
         self.profiler = SystemProfiler(cache_dir)
 
@@ -213,6 +296,9 @@ class EshuFileManager:
         Returns:
             True if successful, False otherwise
         """
+        from rich.panel import Panel
+        from rich.prompt import Confirm
+        from rich.table import Table
 
         console.print(f"\n[cyan]📖 Reading Eshufile from {eshufile_path}...[/cyan]")
 
@@ -272,20 +358,40 @@ class EshuFileManager:
                 console.print("[yellow]Installation cancelled[/yellow]")
                 return False
 
-        # Install packages
-        console.print("\n[cyan]📦 Installing packages...[/cyan]\n")
-
-        if isinstance(packages_to_install, dict):
-            # Install by category
-            for category, packages in packages_to_install.items():
-                console.print(f"\n[bold]Installing {category}:[/bold]")
-                if not self._install_packages(packages, profile):
-                    console.print(f"[yellow]⚠ Some packages in {category} failed to install[/yellow]")
-        else:
-            # Install all at once
-            if not self._install_packages(packages_to_install, profile):
-                console.print("[yellow]⚠ Some packages failed to install[/yellow]")
+        # Authenticate once up front; a background refresh keeps the sudo
+        # timestamp valid so later installs don't hit PAM again
+        install_command = self._install_command([], profile)
+        stop_refresh = None
+        if install_command and install_command[0] == "sudo":
+            if subprocess.run(["sudo", "-v"]).returncode != 0:
+                console.print("[red]✗ sudo authentication failed[/red]")
                 return False
+            stop_refresh = self._start_sudo_refresh()
+
+        try:
+            # Install packages
+            console.print("\n[cyan]📦 Installing packages...[/cyan]\n")
+
+            if isinstance(packages_to_install, dict):
+                # One transaction for everything (one sudo prompt, one package
+                # manager lock); per-category installs only to localize a failure
+                all_packages = list(dict.fromkeys(
+                    pkg for packages in packages_to_install.values() for pkg in packages
+                ))
+                if not self._install_packages(all_packages, profile):
+                    console.print("[yellow]⚠ Combined install failed, retrying by category[/yellow]")
+                    for category, packages in packages_to_install.items():
+                        console.print(f"\n[bold]Installing {category}:[/bold]")
+                        if not self._install_packages(packages, profile):
+                            console.print(f"[yellow]⚠ Some packages in {category} failed to install[/yellow]")
+            else:
+                # Install all at once
+                if not self._install_packages(packages_to_install, profile):
+                    console.print("[yellow]⚠ Some packages failed to install[/yellow]")
+                    return False
+        finally:
+            if stop_refresh is not None:
+                stop_refresh.set()
 
         console.print("\n[green]✓ Eshufile applied successfully![/green]")
         return True
@@ -293,45 +399,30 @@ class EshuFileManager:
     def _categorize_packages(self, packages: Set[str]) -> Dict[str, List[str]]:
         """Categorize packages by intent"""
 
-        categorized = {}
-
-        for category, intents in INTENT_CATEGORIES.items():
-            categorized[category] = []
-
-            for intent_name, intent in intents.items():
-                # Check if any alternative is installed
-                for alt in intent.alternatives:
-                    if alt.lower() in {p.lower() for p in packages}:
-                        categorized[category].append(intent_name)
-                        break
+        # One lookup per installed package; anything matching an alternative
+        # belongs to that intent, everything else goes under "other"
+        matched: Dict[str, Set[str]] = defaultdict(set)
+        uncategorized = set()
+        for pkg in packages:
+            intent_name = _ALT_INDEX.get(pkg.lower())
+            if intent_name:
+                matched[_CATEGORY_BY_INTENT[intent_name]].add(intent_name)
+            else:
+                uncategorized.add(pkg)
+
+        # Sorted lists keep exported files stable; categories keep their order
+        categorized = {
+            category: sorted(matched[category])
+            for category in INTENT_CATEGORIES
+            if matched.get(category)
+        }
 
         # Add uncategorized packages
-        categorized_packages = set()
-        for category_packages in categorized.values():
-            for pkg in category_packages:
-                intent = self._find_intent(pkg)
-                if intent:
-                    categorized_packages.update(intent.alternatives)
-
-        uncategorized = packages - categorized_packages
         if uncategorized:
-            categorized["other"] = list(uncategorized)
-
-        # Remove empty categories
-        categorized = {k: v for k, v in categorized.items() if v}
+            categorized["other"] = sorted(uncategorized)
 
         return categorized
 
-    def _find_intent(self, package_name: str) -> Optional[PackageIntent]:
-        """Find intent for a package name"""
-
-        for category_intents in INTENT_CATEGORIES.values():
-            for intent in category_intents.values():
-                if package_name in intent.alternatives or package_name == intent.name:
-                    return intent
-
-        return None
-
     def _translate_intents(
         self,
         intents: Dict[str, List[str]],
@@ -341,26 +432,33 @@ class EshuFileManager:
 
         translated = {}
 
+        # Unknown intents are translated together in one batch
+        unknown = [
+            name for names in intents.values() for name in names
+            if name not in _ALTS_BY_INTENT
+        ]
+        suggestions = dict(zip(
+            unknown,
+            self.translator.suggest_search_terms_batch(unknown, target_distro)
+        ))
+
         for category, intent_names in intents.items():
-            translated[category] = []
+            # A set, since several intents may resolve to the same package
+            packages = set()
 
             for intent_name in intent_names:
-                # Find the intent
-                intent = None
-                for cat_intents in INTENT_CATEGORIES.values():
-                    if intent_name in cat_intents:
-                        intent = cat_intents[intent_name]
-                        break
-
-                if intent:
+                alternatives = _ALTS_BY_INTENT.get(intent_name)
+
+                if alternatives:
                     # Use the first alternative (or could use LLM to pick best for distro)
-                    package = intent.alternatives[0]
-                    translated[category].append(package)
+                    packages.add(alternatives[0])
                 else:
-                    # Unknown intent, try translation
-                    package_names = self.translator.suggest_search_terms(intent_name, target_distro)
+                    # Unknown intent, use its translation
+                    package_names = suggestions[intent_name]
                     if package_names:
-                        translated[category].append(package_names[0])
+                        packages.add(package_names[0])
+
+            translated[category] = sorted(packages)
 
         return translated
 
@@ -371,14 +469,12 @@ class EshuFileManager:
     ) -> List[str]:
         """Translate raw package list to target distro"""
 
-        translated = []
-
-        for package in packages:
-            # Try translation
-            suggested = self.translator.suggest_search_terms(package, target_distro)
-            translated.append(suggested[0] if suggested else package)
+        suggestions = self.translator.suggest_search_terms_batch(packages, target_distro)
 
-        return translated
+        return [
+            suggested[0] if suggested else package
+            for suggested, package in zip(suggestions, packages)
+        ]
 
     def _install_packages(self, packages: List[str], profile) -> bool:
         """Install packages using appropriate package manager"""
@@ -386,58 +482,128 @@ class EshuFileManager:
         if not packages:
             return True
 
-        # Determine package manager
-        if "pacman" in profile.available_managers:
-            cmd = ["sudo", "pacman", "-S", "--needed", "--noconfirm"] + packages
-        elif "yay" in profile.available_managers:
-            cmd = ["yay", "-S", "--needed", "--noconfirm"] + packages
-        elif "apt" in profile.available_managers:
-            cmd = ["sudo", "apt", "install", "-y"] + packages
-        elif "dnf" in profile.available_managers:
-            cmd = ["sudo", "dnf", "install", "-y"] + packages
-        else:
+        cmd = self._install_command(packages, profile)
+        if cmd is None:
             console.print("[red]✗ No supported package manager found[/red]")
             return False
 
         console.print(f"[dim]Running: {' '.join(cmd)}[/dim]")
 
         try:
-            subprocess.run(cmd, check=True)
+            subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL)
             return True
         except subprocess.CalledProcessError:
             return False
 
+    def _install_command(self, packages: List[str], profile) -> Optional[List[str]]:
+        """Build the install command for the preferred package manager"""
+
+        if "pacman" in profile.available_managers:
+            return ["sudo", "pacman", "-S", "--needed", "--noconfirm"] + packages
+        elif "yay" in profile.available_managers:
+            return ["yay", "-S", "--needed", "--noconfirm"] + packages
+        elif "apt" in profile.available_managers:
+            return ["sudo", "apt", "install", "-y"] + packages
+        elif "dnf" in profile.available_managers:
+            return ["sudo", "dnf", "install", "-y"] + packages
+
+        return None
+
+    def _start_sudo_refresh(self) -> threading.Event:
+        """Refresh cached sudo credentials in the background until the event is set"""
+
+        stop = threading.Event()
+
+        def refresh():
+            while not stop.wait(SUDO_REFRESH_INTERVAL):
+                subprocess.run(
+                    ["sudo", "-n", "-v"],
+                    stdin=subprocess.DEVNULL,
+                    capture_output=True
+                )
+
+        threading.Thread(target=refresh, daemon=True).start()
+        return stop
+
     def _save_eshufile(self, eshufile: EshuFile, path: Path):
         """Save Eshufile to disk"""
 
-        data = asdict(eshufile)
-
-        if path.suffix in [".yaml", ".yml"]:
-            with open(path, 'w') as f:
-                yaml.dump(data, f, default_flow_style=False, sort_keys=False)
-        else:
-            # Default to JSON
-            with open(path, 'w') as f:
-                json.dump(data, f, indent=2)
+        _, dump = _SERIALIZERS.get(path.suffix.lower(), _DEFAULT_SERIALIZER)
+        dump(eshufile.to_dict(), path)
 
     def _load_eshufile(self, path: Path) -> Optional[EshuFile]:
-        """Load Eshufile from disk"""
+        """Load Eshufile from disk, reusing the parsed result for unchanged files"""
 
         try:
-            with open(path, 'r') as f:
-                if path.suffix in [".yaml", ".yml"]:
-                    data = yaml.safe_load(f)
-                else:
-                    data = json.load(f)
-
-            return EshuFile(**data)
+            raw = path.read_bytes()
+            digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+            cached = self._load_parsed(path, digest)
+            if cached is not None:
+                return cached
+
+            load, _ = _SERIALIZERS.get(path.suffix.lower(), _DEFAULT_SERIALIZER)
+            data = load(raw)
+
+            # Names repeat across categories and match the INTENT_CATEGORIES
+            # literals, so interning shares them and speeds up lookups
+            if data.get("intents"):
+                data["intents"] = {
+                    sys.intern(category): [sys.intern(name) for name in names]
+                    for category, names in data["intents"].items()
+                }
+            if data.get("packages"):
+                data["packages"] = [sys.intern(name) for name in data["packages"]]
+
+            eshufile = EshuFile(**data)
+            self._store_parsed(path, digest, eshufile)
+            return eshufile
 
         except Exception as e:
             console.print(f"[red]✗ Error loading Eshufile: {e}[/red]")
             return None
 
+    def _parsed_cache_path(self, path: Path) -> Path:
+        """One cache entry per Eshufile location, replaced when the file changes"""
+
+        name = hashlib.blake2b(str(path.resolve()).encode(), digest_size=16).hexdigest()
+        return self.parsed_cache_dir / f"{name}.pkl"
+
+    def _load_parsed(self, path: Path, digest: str) -> Optional[EshuFile]:
+        """Return the parsed Eshufile cached for path if its content hash matches"""
+
+        try:
+            with open(self._parsed_cache_path(path), 'rb') as f:
+                cached_digest, eshufile = pickle.load(f)
+        except Exception:
+            return None
+
+        if cached_digest != digest or not isinstance(eshufile, EshuFile):
+            return None
+        return eshufile
+
+    def _store_parsed(self, path: Path, digest: str, eshufile: EshuFile):
+        """Cache a parsed Eshufile; failures only cost a re-parse next time"""
+
+        try:
+            self.parsed_cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_path = self._parsed_cache_path(path)
+            tmp_path = cache_path.with_suffix(".pkl.tmp")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((digest, eshufile), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
     def _print_eshufile(self, eshufile: EshuFile):
-        """Print Eshufile to stdout"""
+        """Print Eshufile to stdout as JSON, so `eshu export > system.eshu` loads back"""
 
-        data = asdict(eshufile)
-        print(yaml.dump(data, default_flow_style=False, sort_keys=False))
+        data = eshufile.to_dict()
+
+        if orjson is not None:
+            # Write the encoded bytes directly; flush pending text output first
+            sys.stdout.flush()
+            sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2) + b"\n")
+            sys.stdout.buffer.flush()
+        else:
+            json.dump(data, sys.stdout, indent=2)
+            sys.stdout.write("\n")
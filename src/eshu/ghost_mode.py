@@ -10,9 +10,12 @@ Implements 'eshu try <package>' which:
 This solves "dependency hell" and keeps the host OS clean for one-time-use apps.
 """
 
+import os
+import re
 import subprocess
-import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict, List, Tuple
 from dataclasses import dataclass
@@ -22,6 +25,28 @@ from rich.panel import Panel
 
 console = Console()
 
+# Seconds to wait on a container backend when listing environments
+LIST_TIMEOUT = 5
+# Containers removed in parallel by cleanup_all
+CLEANUP_WORKERS = 4
+
+# Exit status the in-container shell uses to report a failed `apk add`
+PODMAN_INSTALL_FAILED = 97
+
+# Ghost environment names in raw `distrobox list` / `podman ps` output
+_GHOST_NAME = re.compile(rb"eshu-ghost-\S+")
+
+
+@lru_cache(maxsize=8)
+def _which(tool: str, path: str) -> Optional[str]:
+    """shutil.which, remembered per tool and PATH"""
+    return shutil.which(tool, path=path)
+
+
+def _has_tool(tool: str) -> bool:
+    """Check whether a tool is on the current PATH"""
+    return _which(tool, os.environ.get("PATH", "")) is not None
+
 
 @dataclass
 class GhostEnvironment:
@@ -38,17 +63,18 @@ class GhostMode:
 
     def __init__(self):
         self.backend = self._detect_backend()
-        self.active_environments: List[GhostEnvironment] = []
+        # Keyed by environment name
+        self.active_environments: Dict[str, GhostEnvironment] = {}
 
     def _detect_backend(self) -> str:
         """Detect which container backend is available"""
 
         # Priority: distrobox > podman > flatpak
-        if shutil.which("distrobox"):
+        if _has_tool("distrobox"):
             return "distrobox"
-        elif shutil.which("podman"):
+        elif _has_tool("podman"):
             return "podman"
-        elif shutil.which("flatpak"):
+        elif _has_tool("flatpak"):
             return "flatpak"
         else:
             return None
@@ -106,22 +132,30 @@ class GhostMode:
             console.print("[red]✗ Failed to create ghost environment[/red]")
             return False
 
-        self.active_environments.append(env)
+        self.active_environments[env.name] = env
 
         try:
-            # Install package in environment
-            console.print(f"\n[yellow]📦 Installing {package_name} in ghost environment...[/yellow]")
-            if not self._install_in_environment(env, package_name, manager):
-                console.print("[red]✗ Installation failed[/red]")
-                return False
+            if env.backend == "podman":
+                # Install and launch in a single exec rather than one each
+                console.print(f"\n[yellow]📦 Installing and launching {package_name} in ghost environment...[/yellow]")
+                console.print("[dim]Close the app when you're done testing[/dim]\n")
+                if not self._install_and_launch_podman(env, package_name):
+                    console.print("[red]✗ Installation failed[/red]")
+                    return False
+            else:
+                # Install package in environment
+                console.print(f"\n[yellow]📦 Installing {package_name} in ghost environment...[/yellow]")
+                if not self._install_in_environment(env, package_name, manager):
+                    console.print("[red]✗ Installation failed[/red]")
+                    return False
 
-            console.print(f"[green]✓ {package_name} installed in ghost environment[/green]")
+                console.print(f"[green]✓ {package_name} installed in ghost environment[/green]")
 
-            # Launch the application
-            console.print(f"\n[cyan]🚀 Launching {package_name}...[/cyan]")
-            console.print("[dim]Close the app when you're done testing[/dim]\n")
+                # Launch the application
+                console.print(f"\n[cyan]🚀 Launching {package_name}...[/cyan]")
+                console.print("[dim]Close the app when you're done testing[/dim]\n")
 
-            self._launch_app(env, package_name)
+                self._launch_app(env, package_name)
 
             # Ask if user wants to keep it
             if not keep:
@@ -179,6 +213,7 @@ class GhostMode:
                 ["distrobox", "create", "--name", name, "--yes"],
                 capture_output=True,
                 text=True,
+                stdin=subprocess.DEVNULL,
                 check=True
             )
 
@@ -210,6 +245,7 @@ class GhostMode:
                 ],
                 capture_output=True,
                 text=True,
+                stdin=subprocess.DEVNULL,
                 check=True
             )
 
@@ -240,6 +276,7 @@ class GhostMode:
             try:
                 subprocess.run(
                     ["distrobox", "enter", env.name, "--", "eshu", "install", package_name, "--yes"],
+                    stdin=subprocess.DEVNULL,
                     check=True
                 )
                 return True
@@ -252,6 +289,7 @@ class GhostMode:
                 # Detect package manager in container
                 subprocess.run(
                     ["podman", "exec", env.container_id, "apk", "add", package_name],
+                    stdin=subprocess.DEVNULL,
                     check=True
                 )
                 return True
@@ -263,6 +301,7 @@ class GhostMode:
             try:
                 subprocess.run(
                     ["flatpak", "install", "--user", "-y", package_name],
+                    stdin=subprocess.DEVNULL,
                     check=True
                 )
                 return True
@@ -272,7 +311,12 @@ class GhostMode:
         return False
 
     def _launch_app(self, env: GhostEnvironment, package_name: str):
-        """Launch the application from the ghost environment"""
+        """Launch the application from the ghost environment
+
+        The app inherits this process's stdin/stdout/stderr, so its output goes
+        straight to the terminal and nothing is buffered here. Keep it that way:
+        capturing would hold the app's whole log in memory until it exits.
+        """
 
         if env.backend == "distrobox":
             subprocess.run(
@@ -298,6 +342,26 @@ class GhostMode:
                 check=False
             )
 
+    def _install_and_launch_podman(self, env: GhostEnvironment, package_name: str) -> bool:
+        """Install the package and exec it in one `podman exec`
+
+        Returns False only if the install failed; the app's own exit status
+        is ignored like in _launch_app.
+        """
+
+        result = subprocess.run(
+            [
+                "podman", "exec", "-it",
+                "-e", "DISPLAY",
+                env.container_id,
+                "sh", "-c",
+                f'apk add --no-cache "$1" || exit {PODMAN_INSTALL_FAILED}; exec "$1"',
+                "sh", package_name
+            ],
+            check=False
+        )
+        return result.returncode != PODMAN_INSTALL_FAILED
+
     def _get_access_command(self, env: GhostEnvironment, package_name: str) -> str:
         """Get command to access the ghost environment later"""
 
@@ -318,6 +382,7 @@ class GhostMode:
                 subprocess.run(
                     ["distrobox", "rm", "-f", env.name],
                     capture_output=True,
+                    stdin=subprocess.DEVNULL,
                     check=True
                 )
             except subprocess.CalledProcessError:
@@ -328,6 +393,7 @@ class GhostMode:
                 subprocess.run(
                     ["podman", "rm", "-f", env.container_id],
                     capture_output=True,
+                    stdin=subprocess.DEVNULL,
                     check=True
                 )
             except subprocess.CalledProcessError:
@@ -338,67 +404,80 @@ class GhostMode:
                 subprocess.run(
                     ["flatpak", "uninstall", "--user", "-y", env.package_name],
                     capture_output=True,
+                    stdin=subprocess.DEVNULL,
                     check=True
                 )
             except subprocess.CalledProcessError:
                 pass
 
-        # Remove from active list
-        if env in self.active_environments:
-            self.active_environments.remove(env)
+        # Remove from active environments
+        self.active_environments.pop(env.name, None)
 
     def list_environments(self) -> List[GhostEnvironment]:
         """List all active ghost environments"""
 
+        # Both backends are queried at once; each listing is a process spawn
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            distrobox = executor.submit(self._list_distrobox)
+            podman = executor.submit(self._list_podman)
+            return distrobox.result() + podman.result()
+
+    def _list_distrobox(self) -> List[GhostEnvironment]:
+        """List ghost environments created with distrobox"""
+
         environments = []
 
-        # Check distrobox
-        if shutil.which("distrobox"):
+        if _has_tool("distrobox"):
             try:
                 result = subprocess.run(
                     ["distrobox", "list", "--no-color"],
                     capture_output=True,
-                    text=True,
-                    check=True
+                    stdin=subprocess.DEVNULL,
+                    check=True,
+                    timeout=LIST_TIMEOUT
                 )
 
-                for line in result.stdout.split("\n"):
-                    if "eshu-ghost-" in line:
-                        parts = line.split()
-                        if parts:
-                            name = parts[1]
-                            package = name.replace("eshu-ghost-", "")
-                            environments.append(GhostEnvironment(
-                                backend="distrobox",
-                                container_id=name,
-                                name=name,
-                                package_name=package,
-                                created=True
-                            ))
-            except subprocess.CalledProcessError:
+                for match in dict.fromkeys(_GHOST_NAME.findall(result.stdout)):
+                    name = match.decode()
+                    package = name.replace("eshu-ghost-", "")
+                    environments.append(GhostEnvironment(
+                        backend="distrobox",
+                        container_id=name,
+                        name=name,
+                        package_name=package,
+                        created=True
+                    ))
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
                 pass
 
-        # Check podman
-        if shutil.which("podman"):
+        return environments
+
+    def _list_podman(self) -> List[GhostEnvironment]:
+        """List ghost environments created with podman"""
+
+        environments = []
+
+        if _has_tool("podman"):
             try:
                 result = subprocess.run(
                     ["podman", "ps", "-a", "--filter", "name=eshu-ghost-", "--format", "{{.Names}}"],
                     capture_output=True,
-                    text=True,
-                    check=True
+                    stdin=subprocess.DEVNULL,
+                    check=True,
+                    timeout=LIST_TIMEOUT
                 )
 
-                for line in result.stdout.strip().split("\n"):
-                    if line and "eshu-ghost-" in line:
-                        package = line.replace("eshu-ghost-", "")
-                        environments.append(GhostEnvironment(
-                            backend="podman",
-                            container_id=line,
-                            name=line,
-                            package_name=package,
-                            created=True
-                        ))
-            except subprocess.CalledProcessError:
+                for match in dict.fromkeys(_GHOST_NAME.findall(result.stdout)):
+                    name = match.decode()
+                    package = name.replace("eshu-ghost-", "")
+                    environments.append(GhostEnvironment(
+                        backend="podman",
+                        container_id=name,
+                        name=name,
+                        package_name=package,
+                        created=True
+                    ))
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
                 pass
 
         return environments
@@ -419,6 +498,8 @@ class GhostMode:
         if Confirm.ask("\nRemove all ghost environments?", default=False):
             for env in envs:
                 console.print(f"[dim]Removing {env.name}...[/dim]")
-                self._cleanup_environment(env)
+
+            with ThreadPoolExecutor(max_workers=CLEANUP_WORKERS) as executor:
+                list(executor.map(self._cleanup_environment, envs))
 
             console.print(f"\n[green]✓ Cleaned up {len(envs)} ghost environment(s)[/green]")
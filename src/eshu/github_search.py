@@ -1,14 +1,109 @@
 """GitHub repository search for finding packages"""
 
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import MappingProxyType
+
 import requests
-from typing import List, Optional, TYPE_CHECKING
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 from dataclasses import dataclass
+from urllib3.util.retry import Retry
+
+from ._compat import DATACLASS_SLOTS
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
 
 if TYPE_CHECKING:
     from .package_search import PackageResult
 
 
-@dataclass
+# Seconds a cached search is served without asking GitHub at all; after
+# that it is revalidated with If-None-Match (304s don't count against the rate limit)
+SEARCH_CACHE_TTL = 600
+
+_SEARCH_URL = "https://api.github.com/search/repositories"
+# The search API returns at most 100 items per page and 1000 per query;
+# follow-up pages are fetched a few at a time
+SEARCH_PAGE_SIZE = 100
+SEARCH_MAX_PAGES = 10
+SEARCH_PAGE_WORKERS = 6
+
+# Fixed search parameters; only the query and page size vary per call
+_BASE_PARAMS = MappingProxyType({'sort': 'stars', 'order': 'desc'})
+
+# Words that don't change what a search is about ("install firefox" ~ "firefox")
+_QUERY_FILLER_WORDS = frozenset({
+    "a", "an", "the", "for", "to", "me", "please",
+    "install", "get", "download", "setup", "app", "application", "package",
+})
+# A quoted phrase or a whitespace-separated word (qualifiers like language:rust stay whole)
+_QUERY_WORD = re.compile(r'"[^"]*"|\S+')
+
+
+def normalize_query(query: str) -> str:
+    """Drop filler words and case so rephrasings share a cache entry
+
+    Word order is kept: "firefox not chrome" and "chrome not firefox" are
+    different questions.
+    """
+    words = [w for w in _QUERY_WORD.findall(query.casefold()) if w not in _QUERY_FILLER_WORDS]
+    return " ".join(words) or query.strip()
+
+
+# Languages and topics that suggest a repository can be installed
+_INSTALLABLE_LANGS = frozenset({'python', 'rust', 'go', 'c', 'c++', 'javascript', 'typescript'})
+_INSTALLABLE_TOPICS = frozenset({'cli', 'tool', 'utility', 'application', 'package', 'installer'})
+
+# Likely install method per (case-folded) repository language
+_MANAGER_BY_LANG = MappingProxyType({
+    'python': 'pip',
+    'rust': 'cargo',
+    'javascript': 'npm',
+    'typescript': 'npm',
+    'go': 'go-get',
+    'ruby': 'gem',
+})
+
+# One pooled session per process, so repeated searches reuse a warm TLS connection
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Return the shared GitHub API session, creating it on first use"""
+    global _SESSION
+
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            session.headers.update({
+                'User-Agent': 'ESHU/0.3.0',
+                'Accept': 'application/vnd.github.v3+json'
+            })
+            # Authenticated searches get a much higher rate limit
+            if token := os.getenv("GITHUB_TOKEN") or os.getenv("GH_TOKEN"):
+                session.headers['Authorization'] = f"Bearer {token}"
+            session.mount("https://", HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+            ))
+            _SESSION = session
+
+    return _SESSION
+
+
+@dataclass(**DATACLASS_SLOTS)
 class GitHubRepo:
     """Represents a GitHub repository"""
     name: str
@@ -24,15 +119,21 @@ class GitHubRepo:
 class GitHubSearcher:
     """Search GitHub for relevant package repositories"""
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'ESHU/0.3.0',
-            'Accept': 'application/vnd.github.v3+json'
-        })
-        self.api_base = "https://api.github.com"
-
-    def search_repos(self, query: str, max_results: int = 5) -> List["PackageResult"]:
+    def __init__(self, cache_dir: Path = None):
+        if cache_dir is None:
+            cache_dir = Path.home() / ".cache" / "eshu"
+        self.session = _get_session()
+        # One file per (query, max_results), holding the ETag and search items
+        self.search_cache_dir = cache_dir / "github_search"
+        # Fresh searches already seen by this process: cache key -> (ts, items)
+        self._memo: Dict[str, Tuple[float, List[dict]]] = {}
+
+    def search_repos(
+        self,
+        query: str,
+        max_results: int = 5,
+        no_cache: bool = False
+    ) -> List["PackageResult"]:
         """
         Search GitHub for repositories matching the query
 
@@ -41,39 +142,45 @@ class GitHubSearcher:
         - Active maintenance (recent activity)
         - Clear installation instructions
         - Relevant topics/tags
+
+        The query is sent as typed; its normalized form is the cache key, so
+        "install firefox" and "firefox" share one cached search. Pass
+        no_cache=True to always refetch.
         """
 
         try:
             # Build search query with quality filters
-            search_query = f"{query} stars:>50"  # At least 50 stars for quality
-
             params = {
-                'q': search_query,
-                'sort': 'stars',
-                'order': 'desc',
-                'per_page': max_results
+                **_BASE_PARAMS,
+                'q': f"{query} stars:>50",  # At least 50 stars for quality
+                'per_page': min(max_results, SEARCH_PAGE_SIZE)
             }
 
-            response = self.session.get(
-                f"{self.api_base}/search/repositories",
-                params=params,
-                timeout=5
-            )
-
-            if response.status_code != 200:
+            # Rephrasings share cache entries, but GitHub gets the query as typed
+            cache_query = normalize_query(query)
+            items = self._fetch_search_items(params, cache_query, use_cache=not no_cache)
+            if items is None:
                 return []
 
-            data = response.json()
+            # More than one page wanted and the first one was full: fetch the rest at once
+            last_page = min(-(-max_results // SEARCH_PAGE_SIZE), SEARCH_MAX_PAGES)
+            if last_page > 1 and len(items) == SEARCH_PAGE_SIZE:
+                items = items + self._fetch_pages(params, range(2, last_page + 1), cache_query, use_cache=not no_cache)
+                del items[max_results:]
+
             results = []
 
-            for item in data.get('items', []):
+            for item in items:
                 # Skip forks - focus on original repos
                 if item.get('fork', False):
                     continue
 
+                # Case-folded once; GitHub reports null for repos without a detected language
+                language = (item.get('language') or '').casefold()
+
                 # Check if it's actually installable (has releases or clear build instructions)
-                if self._is_installable(item):
-                    result = self._convert_to_package_result(item)
+                if self._is_installable(item, language):
+                    result = self._convert_to_package_result(item, language)
                     if result:
                         results.append(result)
 
@@ -83,38 +190,118 @@ class GitHubSearcher:
             # Silently fail - GitHub search is optional
             return []
 
-    def _is_installable(self, repo_data: dict) -> bool:
-        """Check if repository is likely installable"""
+    def _fetch_pages(self, params: dict, pages: range, cache_query: str, use_cache: bool = True) -> List[dict]:
+        """Fetch follow-up result pages concurrently, stopping at the first short or failed page"""
 
-        # Check for common installable indicators
-        topics = repo_data.get('topics', [])
-        language = repo_data.get('language', '').lower()
+        with ThreadPoolExecutor(max_workers=min(SEARCH_PAGE_WORKERS, len(pages))) as executor:
+            fetched = executor.map(
+                lambda page: self._fetch_search_items({**params, 'page': page}, cache_query, use_cache),
+                pages
+            )
 
-        # Common installable languages/frameworks
-        installable_languages = ['python', 'rust', 'go', 'c', 'c++', 'javascript', 'typescript']
-        installable_topics = ['cli', 'tool', 'utility', 'application', 'package', 'installer']
+            items: List[dict] = []
+            for page_items in fetched:
+                if not page_items:
+                    break
+                items.extend(page_items)
+                if len(page_items) < params['per_page']:
+                    break
+
+            # Pages past the end that haven't started yet aren't worth the rate limit
+            executor.shutdown(cancel_futures=True)
+            return items
+
+    def _fetch_search_items(self, params: dict, cache_query: str, use_cache: bool = True) -> Optional[List[dict]]:
+        """Run a repository search, revalidating the on-disk copy with its ETag
+
+        Results are cached under cache_query, the normalized form of the query.
+        """
+
+        page = params.get('page', 1)
+        key_source = f"{cache_query}\0{params['per_page']}" + (f"\0{page}" if page > 1 else "")
+        key = hashlib.sha256(key_source.encode()).hexdigest()
+
+        if use_cache and key in self._memo:
+            ts, items = self._memo[key]
+            if time.time() - ts < SEARCH_CACHE_TTL:
+                return items
+
+        cache_path = self.search_cache_dir / f"{key}.json"
+
+        cached = None
+        if use_cache:
+            try:
+                with open(cache_path, 'r') as f:
+                    cached = json.load(f)
+            except (OSError, ValueError):
+                pass
+
+        if cached and time.time() - cached.get('ts', 0) < SEARCH_CACHE_TTL:
+            self._memo[key] = (cached['ts'], cached['items'])
+            return cached['items']
+
+        headers = {}
+        if cached and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+
+        response = self.session.get(
+            _SEARCH_URL,
+            params=params,
+            headers=headers,
+            timeout=5
+        )
+
+        if response.status_code == 304 and cached:
+            items = cached['items']
+        elif response.status_code == 200:
+            data = orjson.loads(response.content) if orjson is not None else response.json()
+            items = data.get('items', [])
+        else:
+            return None
+
+        etag = response.headers.get('ETag') or (cached or {}).get('etag')
+        self._memo[key] = (time.time(), items)
+        self._store_search_items(cache_path, etag, items)
+        return items
+
+    def _store_search_items(self, cache_path: Path, etag: Optional[str], items: List[dict]):
+        """Persist search items; failures only cost a full download next time"""
+
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".json.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({'etag': etag, 'ts': time.time(), 'items': items}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+    def _is_installable(self, repo_data: dict, language: str) -> bool:
+        """Check if repository is likely installable (language already case-folded)"""
+
+        # Check for common installable indicators
+        topics = repo_data.get('topics') or ()
 
         # Must have decent stars (already filtered, but double-check)
         if repo_data.get('stargazers_count', 0) < 30:
             return False
 
-        # Check language
-        if language and language in installable_languages:
+        # Check language (the more common hit)
+        if language in _INSTALLABLE_LANGS:
             return True
 
         # Check topics
-        if any(topic in installable_topics for topic in topics):
+        if not _INSTALLABLE_TOPICS.isdisjoint(topics):
             return True
 
         return False
 
-    def _convert_to_package_result(self, repo_data: dict) -> Optional["PackageResult"]:
+    def _convert_to_package_result(self, repo_data: dict, language: str) -> Optional["PackageResult"]:
         """Convert GitHub repo data to PackageResult"""
         from .package_search import PackageResult
 
         try:
             # Determine likely installation method based on language
-            language = repo_data.get('language', '').lower()
             manager = self._guess_package_manager(language, repo_data)
 
             # Build description with metadata
@@ -143,17 +330,20 @@ class GitHubSearcher:
         # Check for package manager files in repo
         # This would require additional API calls, so we'll use heuristics
 
-        language_to_manager = {
-            'python': 'pip',
-            'rust': 'cargo',
-            'javascript': 'npm',
-            'typescript': 'npm',
-            'go': 'go-get',
-            'ruby': 'gem',
-        }
-
         # Default to git/build
-        return language_to_manager.get(language, 'git')
+        return _MANAGER_BY_LANG.get(language, 'git')
+
+
+_SEARCHER: Optional[GitHubSearcher] = None
+
+
+def _get_searcher() -> GitHubSearcher:
+    """Return the shared searcher used by search_github_packages"""
+    global _SEARCHER
+
+    if _SEARCHER is None:
+        _SEARCHER = GitHubSearcher()
+    return _SEARCHER
 
 
 def search_github_packages(query: str, max_results: int = 5) -> List["PackageResult"]:
@@ -167,5 +357,4 @@ def search_github_packages(query: str, max_results: int = 5) -> List["PackageRes
     Returns:
         List of PackageResult objects from GitHub
     """
-    searcher = GitHubSearcher()
-    return searcher.search_repos(query, max_results)
+    return _get_searcher().search_repos(query, max_results)
@@ -1,9 +1,14 @@
 """Package installer with adaptive error handling"""
 
+import re
+import shlex
 import subprocess
 import shutil
 import threading
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional
 from rich.progress import Progress, SpinnerColumn, TextColumn
@@ -15,6 +20,38 @@ from .config import ESHUConfig
 
 console = Console()
 
+# Package managers that prompt, so they get the terminal (matched on the program path)
+_INTERACTIVE_RE = re.compile(r'(?:^|/)(yay|paru|pacman|apt|apt-get|dnf|zypper)$')
+
+# Lines of command output kept for error analysis; the rest is streamed and dropped
+OUTPUT_TAIL_LINES = 200
+
+# Package tools the installer drives or queries directly
+_MANAGER_TOOLS = ("pacman", "apt", "dnf", "zypper", "yay", "paru", "dpkg", "flatpak")
+
+# Package database that verifies each manager's installs (AUR helpers go through pacman)
+_MANAGER_DATABASES = {"pacman": "pacman", "yay": "pacman", "paru": "pacman", "apt": "apt", "flatpak": "flatpak"}
+
+
+@lru_cache(maxsize=1)
+def _available_managers() -> Dict[str, str]:
+    """Resolve the package tools on PATH once per process: name -> path"""
+    return {tool: path for tool in _MANAGER_TOOLS if (path := shutil.which(tool))}
+
+
+def _split_command(cmd) -> List[str]:
+    """Split a plan command into argv; lists pass through
+
+    Commands come from the LLM, so unbalanced quotes fall back to a plain
+    whitespace split instead of raising.
+    """
+    if not isinstance(cmd, str):
+        return cmd
+    try:
+        return shlex.split(cmd)
+    except ValueError:
+        return cmd.split()
+
 
 class PackageInstaller:
     """Handles package installation with adaptive error handling"""
@@ -25,6 +62,8 @@ class PackageInstaller:
         self.profile = system_profile
         self.build_dir = config.build_dir
         self.build_dir.mkdir(parents=True, exist_ok=True)
+        # Serializes fix prompts between concurrent installs
+        self._prompt_lock = threading.Lock()
     
     def install(self, package: PackageResult, auto_confirm: bool = False) -> bool:
         """
@@ -32,11 +71,72 @@ class PackageInstaller:
         Returns True if successful, False otherwise
         """
         
-        print(f"\n📦 Installing {package.name} via {package.manager}...")
+        plan = self._prepare_plan(package, auto_confirm)
+        if plan is None:
+            return False
+        
+        # Install dependencies first
+        if plan['dependencies'] and not self._install_dependencies(plan['dependencies']):
+            print("❌ Failed to install dependencies")
+            return False
+        
+        return self._run_plan(plan, package)
+    
+    def install_many(self, packages: List[PackageResult], auto_confirm: bool = False) -> List[bool]:
+        """
+        Install several packages, building independent ones concurrently
+
+        Plans are generated concurrently, then confirmed one package at a time,
+        and all dependencies go through a single package manager call. Plans that
+        never touch sudo or an interactive package manager (pip, cargo, npm,
+        user-level builds) then run in parallel with their output captured;
+        the rest run one after another with the terminal to themselves.
+        Returns whether each package succeeded, in the order given.
+        """
+        
+        results = [False] * len(packages)
+        plans = []
+        generated = self.llm.generate_install_plans(packages, self.profile)
+        for i, (package, plan) in enumerate(zip(packages, generated)):
+            if self._confirm_plan(package, plan, auto_confirm):
+                plans.append((i, package, plan))
+        
+        dependencies = list(dict.fromkeys(dep for _, _, plan in plans for dep in plan['dependencies']))
+        if dependencies and not self._install_dependencies(dependencies):
+            print("❌ Failed to install dependencies")
+            return results
+        
+        parallel = [job for job in plans if not self._needs_terminal(job[2])]
+        serial = [job for job in plans if self._needs_terminal(job[2])]
+        
+        if parallel:
+            print(f"\n⚙️  Building {len(parallel)} package(s) in parallel...")
+            with ThreadPoolExecutor(max_workers=len(parallel)) as executor:
+                futures = [
+                    (i, executor.submit(self._run_plan, plan, package, False))
+                    for i, package, plan in parallel
+                ]
+                for i, future in futures:
+                    results[i] = future.result()
+        
+        for i, package, plan in serial:
+            results[i] = self._run_plan(plan, package)
+        
+        return results
+    
+    def _prepare_plan(self, package: PackageResult, auto_confirm: bool) -> Optional[Dict]:
+        """Generate and show the installation plan; None if the user declines"""
         
         # Generate installation plan
         plan = self.llm.generate_install_plan(package, self.profile)
         
+        return plan if self._confirm_plan(package, plan, auto_confirm) else None
+    
+    def _confirm_plan(self, package: PackageResult, plan: Dict, auto_confirm: bool) -> bool:
+        """Show an installation plan and ask to proceed"""
+        
+        print(f"\n📦 Installing {package.name} via {package.manager}...")
+        
         print(f"\n📋 Installation Plan:")
         print(f"   Commands: {' && '.join(plan['commands'])}")
         if plan['requires_build']:
@@ -52,29 +152,46 @@ class PackageInstaller:
                 print("❌ Installation cancelled")
                 return False
         
-        # Install dependencies first
-        if plan['dependencies'] and not self._install_dependencies(plan['dependencies']):
-            print("❌ Failed to install dependencies")
-            return False
+        return True
+    
+    def _run_plan(self, plan: Dict, package: PackageResult, echo: bool = True) -> bool:
+        """Execute a plan's commands, then its post-install steps"""
         
         # Execute installation commands
-        success = self._execute_commands(plan['commands'], package)
+        success = self._execute_commands(plan['commands'], package, echo=echo)
         
         if success and plan['post_install']:
-            print("\n🔧 Running post-install steps...")
-            self._execute_commands(plan['post_install'], package, critical=False)
+            print(f"\n🔧 Running post-install steps for {package.name}...")
+            self._execute_commands(plan['post_install'], package, critical=False, echo=echo)
         
         return success
     
+    @staticmethod
+    def _needs_terminal(plan: Dict) -> bool:
+        """True if any step of a plan may prompt (sudo or a package manager)"""
+        
+        for cmd in list(plan['commands']) + list(plan['post_install']):
+            cmd_parts = _split_command(cmd)
+            if not cmd_parts:
+                continue
+            if cmd_parts[0] == "sudo" or _INTERACTIVE_RE.search(cmd_parts[0]):
+                return True
+        return False
+    
     def _install_dependencies(self, dependencies: List[str]) -> bool:
         """Install package dependencies"""
         print(f"\n📦 Installing dependencies: {', '.join(dependencies)}")
         
         # Determine which package manager to use for dependencies
-        if "pacman" in self.profile.available_managers:
+        managers = _available_managers()
+        if "pacman" in managers:
             cmd = ["sudo", "pacman", "-S", "--needed", "--noconfirm"] + dependencies
-        elif "apt" in self.profile.available_managers:
+        elif "apt" in managers:
             cmd = ["sudo", "apt", "install", "-y"] + dependencies
+        elif "dnf" in managers:
+            cmd = ["sudo", "dnf", "install", "-y"] + dependencies
+        elif "zypper" in managers:
+            cmd = ["sudo", "zypper", "--non-interactive", "install"] + dependencies
         else:
             print("⚠️  Unable to determine package manager for dependencies")
             return True  # Continue anyway
@@ -91,23 +208,26 @@ class PackageInstaller:
         self,
         commands: List[str],
         package: PackageResult,
-        critical: bool = True
+        critical: bool = True,
+        echo: bool = True
     ) -> bool:
-        """Execute a list of commands"""
+        """
+        Execute a list of commands
+
+        With echo=False (concurrent installs) output is only kept for error
+        analysis and fix prompts are taken one at a time.
+        """
         
         for cmd in commands:
             print(f"\n▶ Executing: {cmd}")
             
             try:
                 # Parse command
-                if isinstance(cmd, str):
-                    cmd_parts = cmd.split()
-                else:
-                    cmd_parts = cmd
+                cmd_parts = _split_command(cmd)
                 
-                # Determine if this is an interactive command
-                interactive_managers = ['yay', 'paru', 'pacman', 'apt', 'dnf', 'zypper']
-                is_interactive = any(mgr in cmd_parts[0] for mgr in interactive_managers)
+                # Determine if this is an interactive command (looking past sudo)
+                program = cmd_parts[1] if cmd_parts[0] == "sudo" and len(cmd_parts) > 1 else cmd_parts[0]
+                is_interactive = bool(_INTERACTIVE_RE.search(program))
 
                 # Check if this is a long-running command that needs progress indication
                 long_running_cmds = ['cargo', 'npm', 'pip', 'make', 'cmake', 'meson', 'ninja']
@@ -122,7 +242,7 @@ class PackageInstaller:
                         timeout=600,  # 10 minute timeout for interactive
                         cwd=str(self.build_dir) if "make" in cmd or "cmake" in cmd else None
                     )
-                elif needs_progress:
+                elif needs_progress and echo:
                     # Show progress spinner for long-running commands
                     with Progress(
                         SpinnerColumn(),
@@ -130,30 +250,22 @@ class PackageInstaller:
                         console=console
                     ) as progress:
                         task = progress.add_task(f"Installing {package.name}...", total=None)
-                        result = subprocess.run(
+                        self._stream_command(
                             cmd_parts,
-                            check=True,
-                            capture_output=True,
-                            text=True,
                             timeout=600,  # 10 minute timeout for builds
-                            cwd=str(self.build_dir) if "make" in cmd or "cmake" in cmd else None
+                            cwd=str(self.build_dir) if "make" in cmd or "cmake" in cmd else None,
+                            echo=False  # Output would break the spinner
                         )
                         progress.update(task, completed=True)
                 else:
-                    # Capture output for non-interactive commands
-                    result = subprocess.run(
+                    # Stream output for non-interactive commands as it arrives
+                    self._stream_command(
                         cmd_parts,
-                        check=True,
-                        capture_output=True,
-                        text=True,
-                        timeout=300,  # 5 minute timeout
-                        cwd=str(self.build_dir) if "make" in cmd or "cmake" in cmd else None
+                        timeout=600 if needs_progress else 300,
+                        cwd=str(self.build_dir) if "make" in cmd or "cmake" in cmd else None,
+                        echo=echo
                     )
 
-                    # Show output if verbose
-                    if result.stdout:
-                        print(result.stdout)
-
                 print(f"✓ Command completed successfully")
             
             except subprocess.TimeoutExpired:
@@ -166,41 +278,92 @@ class PackageInstaller:
                 print(f"❌ Command failed with exit code {e.returncode}")
                 
                 if critical:
-                    # Use LLM to analyze error and suggest fixes
-                    error_analysis = self.llm.handle_error(
-                        e.stderr if e.stderr else e.stdout,
-                        package,
-                        self.profile
-                    )
-                    
-                    print(f"\n🔍 Error Analysis:")
-                    print(f"   Type: {error_analysis['error_type']}")
-                    print(f"   Diagnosis: {error_analysis['diagnosis']}")
-                    
-                    if error_analysis['solutions']:
-                        print(f"\n💡 Suggested Solutions:")
-                        for i, solution in enumerate(error_analysis['solutions'], 1):
-                            print(f"   {i}. {solution}")
-                    
-                    if error_analysis['commands']:
-                        print(f"\n🔧 Suggested Commands:")
-                        for fix_cmd in error_analysis['commands']:
-                            print(f"   {fix_cmd}")
-                        
-                        response = input("\n❓ Try suggested fixes? [Y/n]: ")
-                        if response.lower() not in ['n', 'no']:
-                            return self._execute_commands(
-                                error_analysis['commands'],
-                                package,
-                                critical=False
-                            )
-                    
-                    return False
+                    with self._prompt_lock:
+                        return self._offer_fixes(e, package)
                 else:
                     print("⚠️  Non-critical command failed, continuing...")
         
         return True
     
+    def _offer_fixes(self, e: subprocess.CalledProcessError, package: PackageResult) -> bool:
+        """Analyze a failed command with the LLM and offer to run its fixes"""
+        
+        # Use LLM to analyze error and suggest fixes
+        error_analysis = self.llm.handle_error(
+            e.stderr if e.stderr else e.stdout,
+            package,
+            self.profile
+        )
+        
+        print(f"\n🔍 Error Analysis:")
+        print(f"   Type: {error_analysis['error_type']}")
+        print(f"   Diagnosis: {error_analysis['diagnosis']}")
+        
+        if error_analysis['solutions']:
+            print(f"\n💡 Suggested Solutions:")
+            for i, solution in enumerate(error_analysis['solutions'], 1):
+                print(f"   {i}. {solution}")
+        
+        if error_analysis['commands']:
+            print(f"\n🔧 Suggested Commands:")
+            for fix_cmd in error_analysis['commands']:
+                print(f"   {fix_cmd}")
+            
+            response = input("\n❓ Try suggested fixes? [Y/n]: ")
+            if response.lower() not in ['n', 'no']:
+                return self._execute_commands(
+                    error_analysis['commands'],
+                    package,
+                    critical=False
+                )
+        
+        return False
+    
+    def _stream_command(
+        self,
+        cmd_parts: List[str],
+        timeout: float,
+        cwd: Optional[str] = None,
+        echo: bool = True
+    ):
+        """
+        Run a command, streaming its combined output line by line
+
+        Only the last OUTPUT_TAIL_LINES lines are kept, so memory stays flat
+        however much a build prints. Raises CalledProcessError/TimeoutExpired
+        like subprocess.run(check=True, timeout=...), with the tail as output.
+        """
+        
+        tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        timed_out = threading.Event()
+        
+        with subprocess.Popen(
+            cmd_parts,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            cwd=cwd
+        ) as proc:
+            def kill():
+                timed_out.set()
+                proc.kill()
+            
+            timer = threading.Timer(timeout, kill)
+            timer.start()
+            try:
+                for line in proc.stdout:
+                    if echo:
+                        print(line, end="")
+                    tail.append(line)
+                returncode = proc.wait()
+            finally:
+                timer.cancel()
+        
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd_parts, timeout, output="".join(tail))
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd_parts, output="".join(tail))
+    
     def build_from_source(
         self,
         package: PackageResult,
@@ -273,37 +436,66 @@ class PackageInstaller:
             print(f"✓ {package.name} is available in PATH")
             return True
         
-        # Check package manager
-        if package.manager == "pacman":
-            result = subprocess.run(
-                ["pacman", "-Q", package.name],
-                capture_output=True,
-                check=False
+        # Ask the database the chosen manager installs into (AUR helpers
+        # install through pacman); for managers without one, ask every
+        # available database at once and let the first that knows it win
+        database = _MANAGER_DATABASES.get(package.manager)
+        managers = _available_managers()
+        probes = [
+            (label, tool, argv)
+            for label, tool, argv in (
+                ("pacman", "pacman", ["pacman", "-Q", package.name]),
+                ("apt", "dpkg", ["dpkg-query", "-W", "-f=${Status}", package.name]),
+                ("flatpak", "flatpak", ["flatpak", "list", "--app", "--columns=application,name"]),
             )
-            if result.returncode == 0:
-                print(f"✓ {package.name} is installed via pacman")
-                return True
+            if tool in managers and database in (None, label)
+        ]
         
-        elif package.manager == "apt":
-            result = subprocess.run(
-                ["dpkg", "-l", package.name],
-                capture_output=True,
-                check=False
-            )
-            if result.returncode == 0:
-                print(f"✓ {package.name} is installed via apt")
-                return True
+        if probes:
+            executor = ThreadPoolExecutor(max_workers=len(probes))
+            pending = {
+                executor.submit(self._run_probe, label, argv, package.name): label
+                for label, _, argv in probes
+            }
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        label = pending.pop(future)
+                        if future.result():
+                            print(f"✓ {package.name} is installed via {label}")
+                            return True
+            finally:
+                executor.shutdown(wait=False)
         
-        elif package.manager == "flatpak":
+        print(f"⚠️  Could not verify installation of {package.name}")
+        return False
+    
+    @staticmethod
+    def _run_probe(label: str, argv: List[str], package_name: str) -> bool:
+        """Run one package database query; True if it lists the package"""
+        
+        try:
             result = subprocess.run(
-                ["flatpak", "list", "--app"],
+                argv,
                 capture_output=True,
                 text=True,
-                check=False
+                stdin=subprocess.DEVNULL,
+                check=False,
+                timeout=30
             )
-            if package.name in result.stdout:
-                print(f"✓ {package.name} is installed via flatpak")
-                return True
+        except (OSError, subprocess.TimeoutExpired):
+            return False
         
-        print(f"⚠️  Could not verify installation of {package.name}")
-        return False
+        if result.returncode != 0:
+            return False
+        if label == "flatpak":
+            # Match the app ID or display name as a whole field
+            return any(
+                package_name in line.split("\t")
+                for line in result.stdout.splitlines()
+            )
+        if label == "apt":
+            # dpkg-query also succeeds for removed packages with leftover config
+            return result.stdout.strip() == "install ok installed"
+        return True
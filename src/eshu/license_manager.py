@@ -4,14 +4,19 @@ import json
 import hashlib
 import time
 import os
+import sqlite3
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 import requests
 
+from ._compat import DATACLASS_SLOTS
 
-@dataclass
+
+@dataclass(**DATACLASS_SLOTS)
 class License:
     """License information"""
     tier: str  # "free" or "premium"
@@ -19,7 +24,7 @@ class License:
     email: Optional[str] = None
     activated_at: Optional[str] = None
     expires_at: Optional[str] = None
-    features: Dict[str, bool] = None
+    features: Mapping[str, bool] = None
     
     def __post_init__(self):
         if self.features is None:
@@ -49,48 +54,61 @@ class License:
         return self.features.get(feature, False)
 
 
-def get_tier_features(tier: str) -> Dict[str, bool]:
-    """Get features for a specific tier"""
-    
-    free_features = {
-        "basic_search": True,
-        "multi_manager_search": True,
-        "package_install": True,
-        "system_profile": True,
-        "basic_llm": False,  # Limited to 10 queries/day
-
-        # Premium features (disabled in free)
-        "snapshots": False,
-        "bloat_analyzer": False,
-        "community_warnings": False,
-        "lightweight_suggestions": False,
-        "adaptive_error_fixing": False,
-        "sandbox_recommendations": False,
-        "unlimited_llm": False,
-        "priority_support": False,
-        "eshu_paths": False,  # Curated package bundles
-    }
-    
-    premium_features = {
-        "basic_search": True,
-        "multi_manager_search": True,
-        "package_install": True,
-        "system_profile": True,
-        "basic_llm": True,
-
-        # Premium features
-        "snapshots": True,
-        "bloat_analyzer": True,
-        "community_warnings": True,
-        "lightweight_suggestions": True,
-        "adaptive_error_fixing": True,
-        "sandbox_recommendations": True,
-        "unlimited_llm": True,
-        "priority_support": True,
-        "eshu_paths": True,  # Curated package bundles
-    }
-    
-    return premium_features if tier == "premium" else free_features
+# Read-only so the shared tables can be handed out without copying
+_FREE_FEATURES = MappingProxyType({
+    "basic_search": True,
+    "multi_manager_search": True,
+    "package_install": True,
+    "system_profile": True,
+    "basic_llm": False,  # Limited to 10 queries/day
+
+    # Premium features (disabled in free)
+    "snapshots": False,
+    "bloat_analyzer": False,
+    "community_warnings": False,
+    "lightweight_suggestions": False,
+    "adaptive_error_fixing": False,
+    "sandbox_recommendations": False,
+    "unlimited_llm": False,
+    "priority_support": False,
+    "eshu_paths": False,  # Curated package bundles
+})
+
+_PREMIUM_FEATURES = MappingProxyType({
+    "basic_search": True,
+    "multi_manager_search": True,
+    "package_install": True,
+    "system_profile": True,
+    "basic_llm": True,
+
+    # Premium features
+    "snapshots": True,
+    "bloat_analyzer": True,
+    "community_warnings": True,
+    "lightweight_suggestions": True,
+    "adaptive_error_fixing": True,
+    "sandbox_recommendations": True,
+    "unlimited_llm": True,
+    "priority_support": True,
+    "eshu_paths": True,  # Curated package bundles
+})
+
+
+def get_tier_features(tier: str) -> Mapping[str, bool]:
+    """Get features for a specific tier (read-only)"""
+    return _PREMIUM_FEATURES if tier == "premium" else _FREE_FEATURES
+
+
+def _key_checksum(data: str) -> str:
+    """Four-character key checksum: the first two SHA-256 bytes as uppercase hex"""
+    return hashlib.sha256(data.encode('utf-8')).digest()[:2].hex().upper()
+
+
+@lru_cache(maxsize=8)
+def _load_license_cached(path: Path, mtime_ns: int, size: int) -> License:
+    """Parse a license file; the stat fields in the key invalidate it on change"""
+    with open(path, 'r') as f:
+        return License(**json.load(f))
 
 
 class LicenseManager:
@@ -99,9 +117,15 @@ class LicenseManager:
     def __init__(self, cache_dir: Path):
         self.cache_dir = Path(cache_dir)
         self.license_file = self.cache_dir / "license.json"
+        # Daily per-feature counts, one row per (date, feature)
+        self.usage_db = self.cache_dir / "usage.db"
+        # Pre-SQLite usage files, imported once and then removed
         self.usage_file = self.cache_dir / "usage.json"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
+        # Opened on the first usage check
+        self._usage_conn: Optional[sqlite3.Connection] = None
+
         # Gumroad product ID for license verification
         # This is the product_id from your Gumroad product settings
         # Set via environment variable GUMROAD_PRODUCT_ID if you need to change it
@@ -116,21 +140,23 @@ class LicenseManager:
     
     def get_license(self) -> License:
         """Get current license"""
-        if not self.license_file.exists():
+        try:
+            stat = self.license_file.stat()
+        except FileNotFoundError:
             # Default to free tier
             return License(tier="free")
         
         try:
-            with open(self.license_file, 'r') as f:
-                data = json.load(f)
-                return License(**data)
+            # Shallow copy so callers can't alter the cached instance
+            return replace(_load_license_cached(self.license_file, stat.st_mtime_ns, stat.st_size))
         except Exception:
             return License(tier="free")
     
     def save_license(self, license: License):
         """Save license to disk"""
+        data = asdict(replace(license, features=dict(license.features)))
         with open(self.license_file, 'w') as f:
-            json.dump(asdict(license), f, indent=2)
+            json.dump(data, f, indent=2)
     
     def activate_license(self, key: str, email: str) -> tuple[bool, str]:
         """Activate a premium license key"""
@@ -237,9 +263,7 @@ class LicenseManager:
         
         # Generate checksum from email and key parts
         data = f"{email}{parts[1]}{parts[2]}{parts[3]}"
-        checksum = hashlib.sha256(data.encode()).hexdigest()[:4].upper()
-        
-        return checksum == parts[4]
+        return _key_checksum(data) == parts[4]
     
     def generate_trial_key(self, email: str) -> str:
         """Generate a trial key (7 days)"""
@@ -253,7 +277,7 @@ class LicenseManager:
         
         # Generate checksum
         data = f"{email}{part1}{part2}{part3}"
-        checksum = hashlib.sha256(data.encode()).hexdigest()[:4].upper()
+        checksum = _key_checksum(data)
         
         return f"ESHU-{part1}-{part2}-{part3}-{checksum}"
     
@@ -264,16 +288,8 @@ class LicenseManager:
         if license.tier == "premium":
             return True, "Unlimited"
         
-        # Load usage data
-        usage = self._load_usage()
         today = datetime.now().strftime("%Y-%m-%d")
         
-        if today not in usage:
-            usage[today] = {}
-        
-        if feature not in usage[today]:
-            usage[today][feature] = 0
-        
         # Check limits
         limits = {
             "llm_queries": 10,
@@ -282,36 +298,84 @@ class LicenseManager:
         }
         
         limit = limits.get(feature, 999999)
-        current = usage[today][feature]
+        conn = self._get_usage_conn()
+        
+        # Count the use only while under the limit, atomically across processes
+        counted = conn.execute(
+            """
+            INSERT INTO usage (date, feature, count) VALUES (?, ?, 1)
+            ON CONFLICT (date, feature) DO UPDATE SET count = count + 1
+            WHERE count < ?
+            """,
+            (today, feature, limit)
+        ).rowcount
         
-        if current >= limit:
+        if not counted:
             return False, f"Daily limit reached ({limit}/{limit}). Upgrade to Premium for unlimited access."
         
-        # Increment usage
-        usage[today][feature] += 1
-        self._save_usage(usage)
+        current = conn.execute(
+            "SELECT count FROM usage WHERE date = ? AND feature = ?",
+            (today, feature)
+        ).fetchone()[0]
         
-        return True, f"{current + 1}/{limit} used today"
+        return True, f"{current}/{limit} used today"
     
-    def _load_usage(self) -> Dict[str, Any]:
-        """Load usage data"""
+    def _get_usage_conn(self) -> sqlite3.Connection:
+        """Open the usage database, creating it and dropping old days on first use"""
+        if self._usage_conn is not None:
+            return self._usage_conn
+        
+        # Autocommit: each upsert is its own cheap WAL transaction
+        conn = sqlite3.connect(self.usage_db, isolation_level=None)
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS usage (
+                date TEXT NOT NULL,
+                feature TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (date, feature)
+            );
+        """)
+        self._import_legacy_usage(conn)
+        
+        # Keep the last 7 days
+        cutoff = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+        conn.execute("DELETE FROM usage WHERE date < ?", (cutoff,))
+        
+        self._usage_conn = conn
+        return conn
+    
+    def _import_legacy_usage(self, conn: sqlite3.Connection):
+        """Move counts from usage.json into the database"""
         if not self.usage_file.exists():
-            return {}
+            return
         
         try:
             with open(self.usage_file, 'r') as f:
-                return json.load(f)
-        except:
-            return {}
-    
-    def _save_usage(self, usage: Dict[str, Any]):
-        """Save usage data"""
-        # Clean old data (keep last 7 days)
-        cutoff = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
-        usage = {k: v for k, v in usage.items() if k >= cutoff}
+                rows = [
+                    (date, feature, count)
+                    for date, features in json.load(f).items()
+                    for feature, count in features.items()
+                ]
+        except (OSError, ValueError, AttributeError):
+            rows = []
         
-        with open(self.usage_file, 'w') as f:
-            json.dump(usage, f, indent=2)
+        if rows:
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    """
+                    INSERT INTO usage (date, feature, count) VALUES (?, ?, ?)
+                    ON CONFLICT (date, feature) DO UPDATE SET count = count + excluded.count
+                    """,
+                    rows
+                )
+        
+        try:
+            self.usage_file.unlink()
+        except OSError:
+            pass
     
     def get_upgrade_url(self) -> str:
         """Get URL to upgrade to premium"""
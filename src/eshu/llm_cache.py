@@ -0,0 +1,116 @@
+"""Exact-match cache for LLM responses"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Rewrite the log with only live entries once it grows past this
+COMPACT_BYTES = 16 * 1024 * 1024
+
+
+class LLMCache:
+    """Cache raw LLM responses by a hash of everything that shaped them
+
+    Entries live in memory for the process and, when a path is given, in an
+    append-only log of pickled (key, created_at, content) records so repeat
+    questions across runs skip the API call. The log is read once on first
+    use; each new response is one append.
+    """
+
+    def __init__(self, path: Optional[Path] = None, ttl: int = 86400):
+        self.path = path
+        self.ttl = ttl
+        # key -> (created_at, content)
+        self._memory: Dict[str, Tuple[float, str]] = {}
+        self._loaded = path is None
+        self._log = None
+        # The engine may run requests from worker threads
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        """Hash the request parameters (provider, model, prompts, sampling) into a key"""
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None if missing or expired"""
+        self._load()
+        entry = self._memory.get(key)
+
+        if entry is None or time.time() - entry[0] > self.ttl:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def set(self, key: str, content: str):
+        """Store a response"""
+        self._load()
+        entry = (time.time(), content)
+        with self._lock:
+            self._memory[key] = entry
+            self._append(key, entry)
+
+    def _load(self):
+        """Read the log into memory on first use, dropping expired entries"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            now = time.time()
+            damaged = False
+            try:
+                with open(self.path, 'rb') as f:
+                    while True:
+                        key, created_at, content = pickle.load(f)
+                        if now - created_at <= self.ttl:
+                            self._memory[key] = (created_at, content)
+                        else:
+                            self._memory.pop(key, None)
+            except (FileNotFoundError, EOFError):
+                pass
+            except (pickle.UnpicklingError, ValueError, TypeError):
+                # A record cut short by an interrupted write; appends after it
+                # would be unreachable, so rewrite the log without it
+                damaged = True
+            except OSError:
+                # The cache is an optimization; run memory-only
+                self.path = None
+                return
+
+            try:
+                if damaged or self.path.stat().st_size > COMPACT_BYTES:
+                    self._compact()
+            except OSError:
+                pass
+
+    def _compact(self):
+        """Rewrite the log with one record per live key"""
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'wb') as f:
+            for key, (created_at, content) in self._memory.items():
+                pickle.dump((key, created_at, content), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def _append(self, key: str, entry: Tuple[float, str]):
+        if self.path is None:
+            return
+        try:
+            if self._log is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._log = open(self.path, 'ab')
+            pickle.dump((key, entry[0], entry[1]), self._log, protocol=pickle.HIGHEST_PROTOCOL)
+            # Flushed but not fsynced: losing the last entry on a crash is fine
+            self._log.flush()
+        except OSError:
+            self.path = None
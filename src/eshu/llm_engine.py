@@ -1,10 +1,250 @@
 """LLM engine for intelligent package search and installation guidance"""
 
 import json
-from typing import List, Dict, Optional, Tuple
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from typing import Callable, List, Dict, Optional, Tuple, Union
 from .config import ESHUConfig
 from .system_profiler import SystemProfile
 from .package_search import PackageResult
+from .llm_cache import LLMCache
+from .github_search import normalize_query
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
+
+# Managers whose basic install command needs no planning: one command, no build
+_TEMPLATE_MANAGERS = frozenset({"pacman", "apt", "flatpak", "snap", "npm", "pip"})
+# Repository version strings (epoch:version-release); anything else goes to the LLM
+_PLAIN_VERSION_RE = re.compile(r"^[\w.+~:-]*$")
+
+# "recommended_index": N in a partial ranking reply, once the number is complete
+_RECOMMENDED_INDEX_RE = re.compile(r'"recommended_index"\s*:\s*(\d+)\s*[,}\s]')
+
+# Outermost {...} in a reply that wraps its JSON in prose
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# Queries whose interpretation is mechanical, as (pattern, intent); the last
+# group is the search term
+_PACKAGE_NAME = r"[a-zA-Z0-9._+-]"
+_RULE_PATTERNS = (
+    (re.compile(rf"^{_PACKAGE_NAME}{{2,64}}$"), "install"),
+    (re.compile(rf"^(?:install|add|get)\s+({_PACKAGE_NAME}+)$", re.IGNORECASE), "install"),
+    (re.compile(r"^(?:search|find|look\s+for)\s+(.+)$", re.IGNORECASE), "search"),
+    (re.compile(rf"^(?:info|show|about)\s+({_PACKAGE_NAME}+)$", re.IGNORECASE), "info"),
+)
+# "<manager> install <package>"
+_MANAGER_INSTALL_RE = re.compile(
+    r"^(pacman|apt|flatpak|snap|yay|paru|cargo|npm|pip)\s+install\s+(\S+)$", re.IGNORECASE
+)
+
+# LLM plans by (manager, package name), reused for the rest of the process
+_PLAN_CACHE: Dict[Tuple[str, str], Dict] = {}
+
+
+def _strip_code_fence(text: str) -> str:
+    """Return the body of a ```-fenced reply, or the stripped text if unfenced"""
+    text = text.strip()
+    if not text.startswith("```"):
+        return text
+    body_start = text.find("\n")
+    body_end = text.rfind("```")
+    if body_start == -1 or body_end <= body_start:
+        return text
+    return text[body_start + 1:body_end].strip()
+
+
+def _json_body(text: str) -> str:
+    """Return the JSON object in a reply, dropping code fences and any prose around it"""
+    text = _strip_code_fence(text)
+    if not text.startswith("{"):
+        match = _JSON_OBJECT_RE.search(text)
+        if match:
+            return match.group(0)
+    return text
+
+
+def _try_rule_based_interpret(query: str) -> Optional[Dict]:
+    """Interpret simple queries ("firefox", "install vlc", "apt install git") without the LLM"""
+    query = query.strip()
+    
+    match = _MANAGER_INSTALL_RE.match(query)
+    if match:
+        manager, term, intent = match.group(1).lower(), match.group(2), "install"
+    else:
+        for pattern, intent in _RULE_PATTERNS:
+            match = pattern.match(query)
+            if match:
+                manager, term = None, match.group(match.lastindex or 0)
+                break
+        else:
+            return None
+    
+    return {
+        "search_terms": [term],
+        "preferred_manager": manager,
+        "intent": intent,
+        "requirements": []
+    }
+
+
+def _error_tail(error_output: Union[str, os.PathLike, None], limit: int) -> str:
+    """The last `limit` characters of an error string or log file"""
+    if error_output is None:
+        return ""
+    if isinstance(error_output, str):
+        return error_output[-limit:]
+    
+    try:
+        with open(error_output, "rb") as f:
+            # Up to 4 bytes per character; the decode trims to the limit
+            f.seek(max(0, os.fstat(f.fileno()).st_size - limit * 4))
+            return f.read().decode("utf-8", errors="replace")[-limit:]
+    except OSError:
+        return ""
+
+
+def _loads(text: str):
+    """Parse a JSON reply"""
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def _dumps(data) -> str:
+    """Serialize compactly; whitespace in prompts only costs tokens"""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+# System prompts depend only on the machine, so each is built once per process;
+# per-request details go in the user message, keeping the prompt prefix stable
+@lru_cache(maxsize=8)
+def _interpret_system_prompt(distro: str, distro_version: str, managers: Tuple[str, ...]) -> str:
+    return f"""You are an expert Linux package manager assistant. The user is running {distro} {distro_version}.
+
+Available package managers: {', '.join(managers)}
+
+Your task is to interpret the user's package installation request and return a JSON object with:
+- "search_terms": list of package names to search for
+- "preferred_manager": preferred package manager if specified (or null)
+- "intent": what the user wants to do (install, search, info, etc.)
+- "requirements": any special requirements mentioned
+
+Be concise and accurate. Return ONLY valid JSON."""
+
+
+@lru_cache(maxsize=8)
+def _rank_system_prompt(distro: str, gpu: str, cpu: str, priority: Tuple[str, ...]) -> str:
+    return f"""You are an expert Linux package manager assistant for {distro}.
+
+User's hardware: GPU={gpu}, CPU={cpu}
+
+Available package managers (in priority order): {', '.join(priority)}
+
+Search results are rows of [index, name, manager, version, description], with a
+sixth element listing community warnings when a package has any.
+
+Analyze the search results for the user's query and provide:
+1. Recommended package index (the best match)
+2. Brief explanation of why it's the best choice
+3. Any warnings or considerations (especially hardware compatibility)
+
+Return JSON with:
+{{
+  "recommended_index": <index>,
+  "explanation": "<brief explanation>",
+  "alternatives": [<list of alternative indices>],
+  "warnings": ["<any warnings>"]
+}}"""
+
+
+@lru_cache(maxsize=8)
+def _plan_system_prompt(distro: str) -> str:
+    return f"""You are an expert Linux system administrator for {distro}.
+
+Generate a detailed installation plan for the package the user names.
+
+Return JSON with:
+{{
+  "commands": ["<list of commands to execute>"],
+  "requires_build": <true/false>,
+  "build_system": "<make/cmake/cargo/meson/etc or null>",
+  "dependencies": ["<list of dependencies>"],
+  "post_install": ["<post-install commands>"],
+  "notes": "<any important notes>"
+}}"""
+
+
+@lru_cache(maxsize=8)
+def _error_system_prompt(distro: str) -> str:
+    return f"""You are an expert Linux troubleshooter for {distro}.
+
+An error occurred while installing a package. Analyze the error and return JSON with:
+{{
+  "error_type": "<dependency/permission/build/network/etc>",
+  "diagnosis": "<brief explanation>",
+  "solutions": ["<list of potential solutions>"],
+  "commands": ["<commands to try>"]
+}}"""
+
+
+@lru_cache(maxsize=8)
+def _bundle_system_prompt(distro: str) -> str:
+    return f"""You are an expert Linux system administrator for {distro}.
+
+When a user wants to install a package, analyze what they're trying to accomplish and suggest a COMPLETE bundle of packages needed for a working setup.
+
+Consider:
+- Essential dependencies and companion tools
+- Configuration tools and utilities
+- Common workflow requirements
+- System integration needs (audio, display, etc.)
+
+Return ONLY a JSON object with this structure:
+{{
+    "name": "Complete <PackageName> Setup",
+    "description": "Brief description of what this bundle provides",
+    "packages": ["package1", "package2", ...],
+    "reasoning": "Why these packages work together",
+    "category": "category-name"
+}}
+
+IMPORTANT:
+- Only suggest packages available in {distro}'s repositories
+- Keep bundles focused - 5-15 packages maximum
+- Every package must serve a clear purpose
+- If it's a simple utility that doesn't need companions, return {{"packages": []}}
+"""
+
+
+# One keep-alive HTTP client per process, shared by every engine and provider
+_HTTP_CLIENT = None
+
+
+def _shared_http_client():
+    """Return the shared httpx client, or None to let the SDK build its own"""
+    global _HTTP_CLIENT
+    
+    if _HTTP_CLIENT is None:
+        try:
+            import httpx  # installed with the anthropic/openai SDKs
+        except ImportError:
+            return None
+        try:
+            import h2  # noqa: F401  (HTTP/2 support, see the "fast" extra)
+            http2 = True
+        except ImportError:
+            http2 = False
+        _HTTP_CLIENT = httpx.Client(
+            http2=http2,
+            timeout=httpx.Timeout(120.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60)
+        )
+    return _HTTP_CLIENT
 
 
 class LLMEngine:
@@ -12,40 +252,204 @@ class LLMEngine:
     
     def __init__(self, config: ESHUConfig):
         self.config = config
-        self.client = None
-        self._initialize_client()
+        # Created on first use: importing an SDK costs more than most commands
+        self._client = None
+        self._check_credentials()
+        
+        # Identical requests made at (near-)zero temperature get identical answers
+        self.response_cache = None
+        if config.llm_cache_enabled and config.temperature <= config.llm_cache_max_temperature:
+            self.response_cache = LLMCache(config.cache_dir / "llm_cache.pkl", ttl=config.llm_cache_ttl)
         
         # Lazy load optional modules
         self.community_checker = None
+        self._checker_future = None
+    
+    def _check_credentials(self):
+        """Fail early if the configured provider has no API key"""
+        if self.config.llm_provider == "anthropic" and not self.config.anthropic_api_key:
+            raise ValueError("Anthropic API key not configured")
+        if self.config.llm_provider == "openai" and not self.config.openai_api_key:
+            raise ValueError("OpenAI API key not configured")
+    
+    @property
+    def client(self):
+        """The provider SDK client, imported and built on first access"""
+        if self._client is None:
+            self._client = self._initialize_client()
+        return self._client
+    
+    @client.setter
+    def client(self, client):
+        self._client = client
     
     def _initialize_client(self):
         """Initialize the appropriate LLM client"""
         if self.config.llm_provider == "anthropic":
-            if not self.config.anthropic_api_key:
-                raise ValueError("Anthropic API key not configured")
             import anthropic
-            self.client = anthropic.Anthropic(api_key=self.config.anthropic_api_key)
+            return anthropic.Anthropic(
+                api_key=self.config.anthropic_api_key,
+                http_client=_shared_http_client()
+            )
         
         elif self.config.llm_provider == "openai":
-            if not self.config.openai_api_key:
-                raise ValueError("OpenAI API key not configured")
             import openai
-            self.client = openai.OpenAI(api_key=self.config.openai_api_key)
+            return openai.OpenAI(
+                api_key=self.config.openai_api_key,
+                http_client=_shared_http_client()
+            )
         
         elif self.config.llm_provider == "ollama":
             import openai
-            self.client = openai.OpenAI(
+            return openai.OpenAI(
                 base_url=self.config.ollama_endpoint,
-                api_key="ollama"  # Ollama doesn't need a real key
+                api_key="ollama",  # Ollama doesn't need a real key
+                http_client=_shared_http_client()
+            )
+        
+        return None
+    
+    @property
+    def _model(self) -> str:
+        """Model name for the configured provider"""
+        if self.config.llm_provider == "ollama":
+            return self.config.ollama_model
+        return self.config.model_name
+    
+    def _complete(
+        self,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """
+        Send one request to the configured provider and parse its JSON reply
+
+        Replies are cached by request when the response cache is enabled; only
+        replies that parsed are stored, so a malformed answer is not replayed.
+        With on_text the reply is streamed and on_text gets each text delta.
+        """
+        
+        model = self._model
+        
+        key = None
+        content = None
+        if self.response_cache is not None:
+            key = LLMCache.make_key(
+                provider=self.config.llm_provider,
+                model=model,
+                system=system_prompt,
+                user=user_message,
+                max_tokens=max_tokens,
+                temperature=self.config.temperature
             )
+            content = self.response_cache.get(key)
+        
+        cached = content is not None
+        if not cached:
+            content = self._request(model, system_prompt, user_message, max_tokens, on_text)
+        elif on_text is not None:
+            on_text(content)
+        
+        result = _loads(_json_body(content))
+        if key is not None and not cached:
+            self.response_cache.set(key, content)
+        return result
+    
+    def _request(
+        self,
+        model: str,
+        system_prompt: str,
+        user_message: str,
+        max_tokens: int,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """Run one completion against the provider and return the reply text"""
+        
+        if self.config.llm_provider == "anthropic":
+            # Prefilling the reply with "{" makes Claude answer with the bare
+            # JSON object (no prose, no code fence)
+            request = dict(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=self.config.temperature,
+                system=system_prompt,
+                messages=[
+                    {"role": "user", "content": user_message},
+                    {"role": "assistant", "content": "{"}
+                ]
+            )
+            if on_text is None:
+                response = self.client.messages.create(**request)
+                return "{" + response.content[0].text
+            
+            parts = ["{"]
+            on_text("{")
+            with self.client.messages.stream(**request) as stream:
+                for text in stream.text_stream:
+                    parts.append(text)
+                    on_text(text)
+            return "".join(parts)
+        
+        elif self.config.llm_provider in ["openai", "ollama"]:
+            request = dict(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_message}
+                ],
+                temperature=self.config.temperature,
+                max_tokens=max_tokens,
+                # JSON mode: the reply is a single JSON object
+                response_format={"type": "json_object"}
+            )
+            if on_text is None:
+                response = self.client.chat.completions.create(**request)
+                return response.choices[0].message.content
+            
+            parts = []
+            for chunk in self.client.chat.completions.create(**request, stream=True):
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    parts.append(text)
+                    on_text(text)
+            return "".join(parts)
+        
+        raise ValueError(f"Unknown LLM provider: {self.config.llm_provider}")
     
     def _get_community_checker(self):
         """Lazy load community checker"""
         if self.community_checker is None:
-            from .community_checker import CommunityChecker
-            self.community_checker = CommunityChecker()
+            if self._checker_future is not None:
+                self.community_checker = self._checker_future.result()
+            else:
+                from .community_checker import CommunityChecker
+                self.community_checker = CommunityChecker()
         return self.community_checker
     
+    def _prefetch_community_checker(self):
+        """Start hardware detection (lspci, /proc/cpuinfo) in the background"""
+        if self.community_checker is None and self._checker_future is None:
+            from .community_checker import CommunityChecker
+            executor = ThreadPoolExecutor(max_workers=1)
+            self._checker_future = executor.submit(CommunityChecker)
+            executor.shutdown(wait=False)
+    
+    @cached_property
+    def _hardware_info(self) -> Dict[str, str]:
+        """Detected hardware; it doesn't change while we run"""
+        return self._get_community_checker().get_hardware_info()
+    
+    @cached_property
+    def _ram_gb(self) -> Optional[float]:
+        """Total RAM in GB, or None without psutil"""
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.virtual_memory().total / (1024**3)
+    
     def interpret_query(self, query: str, system_profile: SystemProfile) -> Dict[str, any]:
         """
         Interpret user's natural language query and extract:
@@ -55,52 +459,42 @@ class LLMEngine:
         - Any special requirements
         """
         
-        system_prompt = f"""You are an expert Linux package manager assistant. The user is running {system_profile.distro} {system_profile.distro_version}.
-
-Available package managers: {', '.join(system_profile.available_managers)}
-
-Your task is to interpret the user's package installation request and return a JSON object with:
-- "search_terms": list of package names to search for
-- "preferred_manager": preferred package manager if specified (or null)
-- "intent": what the user wants to do (install, search, info, etc.)
-- "requirements": any special requirements mentioned
-
-Be concise and accurate. Return ONLY valid JSON."""
-
+        # Ranking comes next in the search flow; detect hardware in the meantime
+        self._prefetch_community_checker()
+        
+        interpretation = _try_rule_based_interpret(query)
+        if interpretation is not None:
+            return interpretation
+        
+        system_prompt = _interpret_system_prompt(
+            system_profile.distro,
+            system_profile.distro_version,
+            tuple(system_profile.available_managers)
+        )
+        
         user_message = f"User query: {query}"
         
+        # Rephrasings ("install firefox", "get firefox please") reduce to the
+        # same keywords and share one interpretation
+        paraphrase_key = None
+        if self.response_cache is not None:
+            paraphrase_key = LLMCache.make_key(
+                kind="interpretation",
+                provider=self.config.llm_provider,
+                system=system_prompt,
+                model=self._model,
+                temperature=self.config.temperature,
+                query=normalize_query(query)
+            )
+            cached = self.response_cache.get(paraphrase_key)
+            if cached is not None:
+                return _loads(cached)
+        
         try:
-            if self.config.llm_provider == "anthropic":
-                response = self.client.messages.create(
-                    model=self.config.model_name,
-                    max_tokens=self.config.max_tokens,
-                    temperature=self.config.temperature,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": user_message}]
-                )
-                content = response.content[0].text
-            
-            elif self.config.llm_provider in ["openai", "ollama"]:
-                model = self.config.model_name if self.config.llm_provider == "openai" else self.config.ollama_model
-                response = self.client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_message}
-                    ],
-                    temperature=self.config.temperature,
-                    max_tokens=self.config.max_tokens
-                )
-                content = response.choices[0].message.content
-            
-            # Parse JSON response
-            # Remove markdown code blocks if present
-            content = content.strip()
-            if content.startswith("```"):
-                lines = content.split("\n")
-                content = "\n".join(lines[1:-1])
-            
-            return json.loads(content)
+            interpretation = self._complete(system_prompt, user_message, max_tokens=self.config.max_tokens)
+            if paraphrase_key is not None:
+                self.response_cache.set(paraphrase_key, _dumps(interpretation))
+            return interpretation
         
         except Exception as e:
             print(f"LLM interpretation error: {e}")
@@ -117,17 +511,22 @@ Be concise and accurate. Return ONLY valid JSON."""
         query: str,
         results: List[PackageResult],
         system_profile: SystemProfile,
-        check_community: bool = True
+        check_community: bool = True,
+        on_recommended: Optional[Callable[[PackageResult], None]] = None
     ) -> List[Tuple[PackageResult, str]]:
         """
         Use LLM to intelligently rank results and provide recommendations.
         Returns list of (PackageResult, recommendation_text) tuples.
+
+        If on_recommended is given the reply is streamed, and it is called with
+        the recommended result as soon as the model has named it.
         """
         
         if not results:
             return []
         
-        # Check for community warnings if enabled
+        # Check for community warnings if enabled (in-memory lookups, so no
+        # need to fan these out)
         community_warnings = {}
         if check_community:
             checker = self._get_community_checker()
@@ -136,89 +535,58 @@ Be concise and accurate. Return ONLY valid JSON."""
                 if warnings:
                     community_warnings[i] = warnings
         
-        # Prepare results summary for LLM
-        results_summary = []
-        for i, result in enumerate(results[:15]):  # Limit to top 15
-            result_data = {
-                "index": i,
-                "name": result.name,
-                "manager": result.manager,
-                "repository": result.repository,
-                "version": result.version,
-                "description": result.description[:100] if result.description else "",
-                "installed": result.installed
-            }
-            
-            # Add community warnings if any
-            if i in community_warnings:
-                result_data["community_warnings"] = [
-                    {
-                        "severity": w.severity,
-                        "title": w.title,
-                        "description": w.description
-                    }
-                    for w in community_warnings[i]
-                ]
-            
-            results_summary.append(result_data)
+        # Nothing to rank: answer without the LLM (and without the early
+        # on_recommended report, since the full answer is already here)
+        obvious = self._obvious_pick(query, results)
+        if obvious is not None:
+            index, explanation = obvious
+            rec_text = self._recommendation_text(explanation, [], community_warnings.get(index, []))
+            return [(results[index], rec_text)] + [(r, "") for i, r in enumerate(results) if i != index]
+        
+        # Prepare results summary for LLM: one compact row per result (see
+        # _rank_system_prompt for the columns); warnings only where there are any
+        results_summary = [
+            (i, result.name, result.manager, result.version or "", (result.description or "")[:60])
+            for i, result in enumerate(results[:15])  # Limit to top 15
+        ]
+        for i, warnings in community_warnings.items():
+            results_summary[i] += ([f"{w.severity}: {w.title} - {w.description}" for w in warnings],)
         
         # Get hardware info for context
-        hardware_info = self._get_community_checker().get_hardware_info()
+        hardware_info = self._hardware_info
         
-        system_prompt = f"""You are an expert Linux package manager assistant for {system_profile.distro}.
-
-User's hardware: GPU={hardware_info['gpu']}, CPU={hardware_info['cpu']}
-
-The user searched for: "{query}"
-
-Available package managers (in priority order): {', '.join(self.config.package_manager_priority)}
-
-Analyze the search results and provide:
-1. Recommended package index (the best match)
-2. Brief explanation of why it's the best choice
-3. Any warnings or considerations (especially hardware compatibility)
-
-Return JSON with:
-{{
-  "recommended_index": <index>,
-  "explanation": "<brief explanation>",
-  "alternatives": [<list of alternative indices>],
-  "warnings": ["<any warnings>"]
-}}"""
-
-        user_message = f"Search results:\n{json.dumps(results_summary, indent=2)}"
+        system_prompt = _rank_system_prompt(
+            system_profile.distro,
+            hardware_info['gpu'],
+            hardware_info['cpu'],
+            tuple(self.config.package_manager_priority)
+        )
         
+        user_message = f'The user searched for: "{query}"\n\nSearch results:\n{_dumps(results_summary)}'
+        
+        # Index of a pick already reported while streaming, kept first even
+        # if the full reply then fails to parse
+        reported_index = None
         try:
-            if self.config.llm_provider == "anthropic":
-                response = self.client.messages.create(
-                    model=self.config.model_name,
-                    max_tokens=1024,
-                    temperature=self.config.temperature,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": user_message}]
-                )
-                content = response.content[0].text
-            
-            elif self.config.llm_provider in ["openai", "ollama"]:
-                model = self.config.model_name if self.config.llm_provider == "openai" else self.config.ollama_model
-                response = self.client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_message}
-                    ],
-                    temperature=self.config.temperature,
-                    max_tokens=1024
-                )
-                content = response.choices[0].message.content
-            
-            # Parse response
-            content = content.strip()
-            if content.startswith("```"):
-                lines = content.split("\n")
-                content = "\n".join(lines[1:-1])
+            on_text = None
+            if on_recommended is not None:
+                streamed = []
+                matched = False
+                
+                def on_text(text: str):
+                    nonlocal matched, reported_index
+                    if matched:
+                        return
+                    streamed.append(text)
+                    match = _RECOMMENDED_INDEX_RE.search("".join(streamed))
+                    if match:
+                        matched = True
+                        index = int(match.group(1))
+                        if 0 <= index < len(results):
+                            reported_index = index
+                            on_recommended(results[index])
             
-            recommendation = json.loads(content)
+            recommendation = self._complete(system_prompt, user_message, max_tokens=1024, on_text=on_text)
             
             # Reorder results based on recommendation
             recommended_idx = recommendation.get("recommended_index", 0)
@@ -226,22 +594,16 @@ Return JSON with:
             explanation = recommendation.get("explanation", "")
             warnings = recommendation.get("warnings", [])
             
-            # Add community warnings to the explanation
-            if recommended_idx in community_warnings:
-                for warning in community_warnings[recommended_idx]:
-                    if warning.severity == "critical":
-                        warnings.insert(0, f"🔴 {warning.title}: {warning.description}")
-                    elif warning.severity == "warning":
-                        warnings.append(f"⚠️  {warning.title}: {warning.description}")
-            
             # Build ordered results with recommendations
             ordered_results = []
             
             # Add recommended package first
             if 0 <= recommended_idx < len(results):
-                rec_text = f"✓ RECOMMENDED: {explanation}"
-                if warnings:
-                    rec_text += f"\n" + "\n".join(warnings)
+                rec_text = self._recommendation_text(
+                    explanation,
+                    warnings,
+                    community_warnings.get(recommended_idx, [])
+                )
                 ordered_results.append((results[recommended_idx], rec_text))
             
             # Add alternatives
@@ -264,7 +626,39 @@ Return JSON with:
         except Exception as e:
             print(f"LLM ranking error: {e}")
             # Fallback: return results as-is with empty recommendations
-            return [(r, "") for r in results]
+            if reported_index is None:
+                return [(r, "") for r in results]
+            return [(results[reported_index], "")] + [(r, "") for i, r in enumerate(results) if i != reported_index]
+    
+    @staticmethod
+    def _obvious_pick(query: str, results: List[PackageResult]) -> Optional[Tuple[int, str]]:
+        """(index, explanation) when there is only one realistic choice, else None"""
+        
+        if len(results) == 1:
+            return 0, "Only result for your search"
+        
+        query_lc = query.strip().lower()
+        exact = [i for i, result in enumerate(results) if result.name.lower() == query_lc]
+        if len(exact) == 1 and (len(results) < 3 or results[exact[0]].installed):
+            return exact[0], "Exact name match"
+        
+        return None
+    
+    @staticmethod
+    def _recommendation_text(explanation: str, warnings: List[str], community: List) -> str:
+        """Recommendation line plus model and community warnings, critical ones first"""
+        
+        warnings = list(warnings)
+        for warning in community:
+            if warning.severity == "critical":
+                warnings.insert(0, f"🔴 {warning.title}: {warning.description}")
+            elif warning.severity == "warning":
+                warnings.append(f"⚠️  {warning.title}: {warning.description}")
+        
+        rec_text = f"✓ RECOMMENDED: {explanation}"
+        if warnings:
+            rec_text += "\n" + "\n".join(warnings)
+        return rec_text
     
     def suggest_lightweight_alternative(
         self,
@@ -275,13 +669,10 @@ Return JSON with:
         
         # Check system resources
         try:
-            import psutil
-            
-            # Get RAM
-            ram_gb = psutil.virtual_memory().total / (1024**3)
+            ram_gb = self._ram_gb
             
             # If system has less than 4GB RAM, suggest lightweight alternatives
-            if ram_gb < 4:
+            if ram_gb is not None and ram_gb < 4:
                 checker = self._get_community_checker()
                 alternatives = checker.suggest_alternatives(package_name, reason="lightweight")
                 
@@ -295,7 +686,8 @@ Return JSON with:
     def generate_install_plan(
         self,
         package: PackageResult,
-        system_profile: SystemProfile
+        system_profile: SystemProfile,
+        force_llm: bool = False
     ) -> Dict[str, any]:
         """
         Generate an installation plan for a package, including:
@@ -303,61 +695,60 @@ Return JSON with:
         - Dependency handling
         - Build instructions if needed
         - Post-install steps
+
+        Plain repository installs use the built-in template and plans are
+        reused for the rest of the process; force_llm=True always asks the model.
         """
         
-        system_prompt = f"""You are an expert Linux system administrator for {system_profile.distro}.
-
-Generate a detailed installation plan for the following package:
+        if not force_llm:
+            if self._is_trivial_install(package):
+                return self._generate_basic_install_plan(package)
+            plan = _PLAN_CACHE.get((package.manager, package.name))
+            if plan is not None:
+                return plan
+        
+        system_prompt = _plan_system_prompt(system_profile.distro)
+        user_message = f"""Generate an installation plan for the following package:
 - Name: {package.name}
 - Manager: {package.manager}
 - Repository: {package.repository}
-- Version: {package.version}
-
-Return JSON with:
-{{
-  "commands": ["<list of commands to execute>"],
-  "requires_build": <true/false>,
-  "build_system": "<make/cmake/cargo/meson/etc or null>",
-  "dependencies": ["<list of dependencies>"],
-  "post_install": ["<post-install commands>"],
-  "notes": "<any important notes>"
-}}"""
+- Version: {package.version}"""
 
         try:
-            if self.config.llm_provider == "anthropic":
-                response = self.client.messages.create(
-                    model=self.config.model_name,
-                    max_tokens=2048,
-                    temperature=self.config.temperature,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": "Generate installation plan"}]
-                )
-                content = response.content[0].text
-            
-            elif self.config.llm_provider in ["openai", "ollama"]:
-                model = self.config.model_name if self.config.llm_provider == "openai" else self.config.ollama_model
-                response = self.client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": "Generate installation plan"}
-                    ],
-                    temperature=self.config.temperature,
-                    max_tokens=2048
-                )
-                content = response.choices[0].message.content
-            
-            content = content.strip()
-            if content.startswith("```"):
-                lines = content.split("\n")
-                content = "\n".join(lines[1:-1])
-            
-            return json.loads(content)
+            plan = self._complete(system_prompt, user_message, max_tokens=2048)
+            _PLAN_CACHE[package.manager, package.name] = plan
+            return plan
         
         except Exception as e:
             # Skip AI silently - don't annoy users with 404 errors
             return self._generate_basic_install_plan(package)
     
+    def generate_install_plans(
+        self,
+        packages: List[PackageResult],
+        system_profile: SystemProfile
+    ) -> List[Dict[str, any]]:
+        """Generate plans for several packages, with up to max_concurrent_llm requests in flight"""
+        
+        if len(packages) <= 1:
+            return [self.generate_install_plan(package, system_profile) for package in packages]
+        
+        with ThreadPoolExecutor(max_workers=min(self.config.max_concurrent_llm, len(packages))) as executor:
+            return list(executor.map(
+                lambda package: self.generate_install_plan(package, system_profile),
+                packages
+            ))
+    
+    @staticmethod
+    def _is_trivial_install(package: PackageResult) -> bool:
+        """True if the manager's one-line install command is the whole plan"""
+        return (
+            package.manager in _TEMPLATE_MANAGERS
+            # GitHub results are named after a repo, not a published package
+            and not package.repository.startswith("github:")
+            and bool(_PLAIN_VERSION_RE.match(package.version or ""))
+        )
+    
     def _generate_basic_install_plan(self, package: PackageResult) -> Dict[str, any]:
         """Generate a basic installation plan without LLM"""
         
@@ -407,75 +798,16 @@ Return JSON with:
         if not self.client:
             return None
 
-        system_prompt = f"""You are an expert Linux system administrator for {system_profile.distro}.
-
-When a user wants to install a package, analyze what they're trying to accomplish and suggest a COMPLETE bundle of packages needed for a working setup.
-
-Consider:
-- Essential dependencies and companion tools
-- Configuration tools and utilities
-- Common workflow requirements
-- System integration needs (audio, display, etc.)
-
-Return ONLY a JSON object with this structure:
-{{
-    "name": "Complete <PackageName> Setup",
-    "description": "Brief description of what this bundle provides",
-    "packages": ["package1", "package2", ...],
-    "reasoning": "Why these packages work together",
-    "category": "category-name"
-}}
-
-IMPORTANT:
-- Only suggest packages available in {system_profile.distro}'s repositories
-- Keep bundles focused - 5-15 packages maximum
-- Every package must serve a clear purpose
-- If it's a simple utility that doesn't need companions, return null
-"""
-
-        user_prompt = f"""Package requested: {package_name}
+        system_prompt = _bundle_system_prompt(system_profile.distro)
+        user_message = f"""Package requested: {package_name}
 
 System: {system_profile.distro} {system_profile.distro_version}
 Available package managers: {', '.join(system_profile.available_managers)}
 
-Suggest a complete bundle if this package needs companions, or return null if it's standalone."""
+Suggest a complete bundle if this package needs companions, or an empty package list if it's standalone."""
 
         try:
-            if self.config.llm_provider == "anthropic":
-                response = self.client.messages.create(
-                    model=self.config.llm_model,
-                    max_tokens=1000,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": user_prompt}]
-                )
-                content = response.content[0].text
-
-            elif self.config.llm_provider in ["openai", "ollama"]:
-                response = self.client.chat.completions.create(
-                    model=self.config.llm_model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    max_tokens=1000
-                )
-                content = response.choices[0].message.content
-
-            else:
-                return None
-
-            # Parse JSON response
-            # Clean markdown code blocks if present
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif content.startswith("```"):
-                content = content.split("```")[1].split("```")[0].strip()
-
-            if content.lower() == "null":
-                return None
-
-            bundle = json.loads(content)
+            bundle = self._complete(system_prompt, user_message, max_tokens=1000)
 
             # Validate the bundle has required fields
             required = ["name", "description", "packages", "reasoning"]
@@ -495,58 +827,25 @@ Suggest a complete bundle if this package needs companions, or return null if it
 
     def handle_error(
         self,
-        error_output: str,
+        error_output: Union[str, os.PathLike, None],
         package: PackageResult,
         system_profile: SystemProfile
     ) -> Dict[str, any]:
         """
         Analyze installation error and suggest fixes
+
+        error_output is the command output or a path to a log file; only its
+        last max_error_chars characters are sent, which is where errors end up.
         """
         
-        system_prompt = f"""You are an expert Linux troubleshooter for {system_profile.distro}.
-
-An error occurred while installing {package.name} via {package.manager}.
-
-Analyze the error and provide:
-{{
-  "error_type": "<dependency/permission/build/network/etc>",
-  "diagnosis": "<brief explanation>",
-  "solutions": ["<list of potential solutions>"],
-  "commands": ["<commands to try>"]
-}}"""
-
-        user_message = f"Error output:\n{error_output[:2000]}"  # Limit error output
+        system_prompt = _error_system_prompt(system_profile.distro)
+        user_message = (
+            f"An error occurred while installing {package.name} via {package.manager}.\n\n"
+            "Error output:\n" + _error_tail(error_output, self.config.max_error_chars)
+        )
         
         try:
-            if self.config.llm_provider == "anthropic":
-                response = self.client.messages.create(
-                    model=self.config.model_name,
-                    max_tokens=1024,
-                    temperature=self.config.temperature,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": user_message}]
-                )
-                content = response.content[0].text
-            
-            elif self.config.llm_provider in ["openai", "ollama"]:
-                model = self.config.model_name if self.config.llm_provider == "openai" else self.config.ollama_model
-                response = self.client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_message}
-                    ],
-                    temperature=self.config.temperature,
-                    max_tokens=1024
-                )
-                content = response.choices[0].message.content
-            
-            content = content.strip()
-            if content.startswith("```"):
-                lines = content.split("\n")
-                content = "\n".join(lines[1:-1])
-            
-            return json.loads(content)
+            return self._complete(system_prompt, user_message, max_tokens=1024)
         
         except Exception as e:
             # Skip AI silently - don't annoy users with 404 errors
@@ -1,7 +1,14 @@
 """System maintenance - update and clean all package managers (Premium feature)"""
 
+import os
+import shutil
 import subprocess
-from typing import Dict, List, Tuple
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
@@ -9,261 +16,358 @@ from rich.panel import Panel
 
 console = Console()
 
+# Per-command limit, and how many lines of output a failure message keeps
+COMMAND_TIMEOUT = 600
+OUTPUT_TAIL_LINES = 10
+
+# Managers that share the system package database lock or prompt for sudo;
+# these run one at a time, everything else runs alongside them
+SERIAL_MANAGERS = frozenset({"pacman", "yay", "paru", "apt", "snap"})
+
+
+def _failure_message(message: str, output: str) -> str:
+    """A failure message followed by the end of the command's output"""
+    output = output.strip()
+    return f"{message}:\n{output}" if output else message
+
 
 class SystemMaintainer:
     """Handles system-wide package manager maintenance"""
 
+    # Text marking one updated package in each manager's output
+    _KEYWORDS = {
+        "pacman": "upgrading",
+        "yay": "upgrading",
+        "paru": "upgrading",
+        "apt": "upgraded",
+        "flatpak": "updated",
+        "snap": "refreshed",
+        "cargo": "updated",
+        "npm": "changed",
+        "pip": "Successfully installed",
+    }
+
     def __init__(self, available_managers: List[str]):
         self.available_managers = available_managers
         self.results = {}
+        # Resolve each tool once rather than searching PATH on every exec
+        self._bin = {
+            tool: shutil.which(tool) or tool
+            for tool in (*available_managers, "sudo", "pip3")
+        }
+
+    @cached_property
+    def _has_cargo_update(self) -> bool:
+        """Whether cargo-update is installed
+
+        Cargo runs `cargo install-update` as the cargo-install-update binary
+        from PATH or $CARGO_HOME/bin, so look for that instead of starting cargo.
+        """
+        if shutil.which("cargo-install-update"):
+            return True
+        cargo_home = Path(os.environ.get("CARGO_HOME") or Path.home() / ".cargo")
+        return os.access(cargo_home / "bin" / "cargo-install-update", os.X_OK)
 
     def update_all(self) -> Dict[str, Dict]:
         """Update all available package managers"""
-        results = {}
+        jobs = []
 
         # Pacman
         if "pacman" in self.available_managers:
-            results["pacman"] = self._update_pacman()
+            jobs.append(("pacman", self._update_pacman))
 
         # Yay/Paru (AUR)
         if "yay" in self.available_managers:
-            results["yay"] = self._update_yay()
+            jobs.append(("yay", self._update_yay))
         elif "paru" in self.available_managers:
-            results["paru"] = self._update_paru()
+            jobs.append(("paru", self._update_paru))
 
         # Apt
         if "apt" in self.available_managers:
-            results["apt"] = self._update_apt()
+            jobs.append(("apt", self._update_apt))
 
         # Flatpak
         if "flatpak" in self.available_managers:
-            results["flatpak"] = self._update_flatpak()
+            jobs.append(("flatpak", self._update_flatpak))
 
         # Snap
         if "snap" in self.available_managers:
-            results["snap"] = self._update_snap()
+            jobs.append(("snap", self._update_snap))
 
         # Cargo
         if "cargo" in self.available_managers:
-            results["cargo"] = self._update_cargo()
+            jobs.append(("cargo", self._update_cargo))
 
         # NPM
         if "npm" in self.available_managers:
-            results["npm"] = self._update_npm()
+            jobs.append(("npm", self._update_npm))
 
         # Pip
         if "pip" in self.available_managers or "pip3" in self.available_managers:
-            results["pip"] = self._update_pip()
+            jobs.append(("pip", self._update_pip))
 
+        results = self._run_jobs(jobs)
         self.results = results
         return results
 
     def clean_all(self) -> Dict[str, Dict]:
         """Clean caches and remove orphaned packages"""
-        results = {}
+        jobs = []
 
         # Pacman
         if "pacman" in self.available_managers:
-            results["pacman"] = self._clean_pacman()
+            jobs.append(("pacman", self._clean_pacman))
 
         # Apt
         if "apt" in self.available_managers:
-            results["apt"] = self._clean_apt()
+            jobs.append(("apt", self._clean_apt))
 
         # Flatpak
         if "flatpak" in self.available_managers:
-            results["flatpak"] = self._clean_flatpak()
+            jobs.append(("flatpak", self._clean_flatpak))
 
         # Cargo
         if "cargo" in self.available_managers:
-            results["cargo"] = self._clean_cargo()
+            jobs.append(("cargo", self._clean_cargo))
 
         # NPM
         if "npm" in self.available_managers:
-            results["npm"] = self._clean_npm()
+            jobs.append(("npm", self._clean_npm))
 
-        return results
+        return self._run_jobs(jobs)
+
+    def _run_jobs(self, jobs: List[Tuple[str, Callable[[], Dict]]]) -> Dict[str, Dict]:
+        """Run (manager, method) jobs, overlapping the ones that can't conflict
+
+        Managers in SERIAL_MANAGERS run one after another in a single worker;
+        each other manager gets its own worker. Results keep the jobs' order.
+        """
+        serial = [job for job in jobs if job[0] in SERIAL_MANAGERS]
+        groups = [[job] for job in jobs if job[0] not in SERIAL_MANAGERS]
+        if serial:
+            groups.insert(0, serial)
+        if not groups:
+            return {}
+
+        def run_group(group):
+            return [(name, method()) for name, method in group]
+
+        finished = {}
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            for group_results in executor.map(run_group, groups):
+                finished.update(group_results)
+
+        return {name: finished[name] for name, _ in jobs}
+
+    def _run_command(self, cmd: List[str], description: str, keyword: str = "") -> Tuple[bool, str, int]:
+        """
+        Run a maintenance command, streaming its combined output
+
+        Returns (success, last OUTPUT_TAIL_LINES lines of output, number of
+        lines containing keyword). Counting as the lines go by means a long
+        upgrade transcript is never held in memory.
+        """
+        tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        count = 0
 
-    def _run_command(self, cmd: List[str], description: str) -> Tuple[bool, str]:
-        """Run a maintenance command"""
         try:
-            result = subprocess.run(
+            proc = subprocess.Popen(
                 cmd,
-                capture_output=True,
-                text=True,
-                timeout=600  # 10 minute timeout
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True
             )
-
-            if result.returncode == 0:
-                return True, result.stdout
-            else:
-                return False, result.stderr
-
-        except subprocess.TimeoutExpired:
-            return False, "Command timed out after 10 minutes"
         except Exception as e:
-            return False, str(e)
+            return False, str(e), 0
+
+        def read():
+            nonlocal count
+            with proc.stdout:
+                for line in proc.stdout:
+                    if keyword and keyword in line:
+                        count += 1
+                    tail.append(line)
+
+        # Read on a daemon thread: a process left behind by sudo can hold the
+        # pipe open after the command itself is killed, and the read would
+        # never return
+        reader = threading.Thread(target=read, daemon=True)
+        reader.start()
+        reader.join(COMMAND_TIMEOUT)
+        if reader.is_alive():
+            proc.kill()
+            proc.wait()
+            return False, f"Command timed out after {COMMAND_TIMEOUT} seconds", count
+
+        return proc.wait() == 0, "".join(tail), count
 
     # Update methods
 
     def _update_pacman(self) -> Dict:
         """Update pacman packages"""
-        success, output = self._run_command(
-            ["sudo", "pacman", "-Syu", "--noconfirm"],
-            "Updating pacman packages"
+        success, output, updated_count = self._run_command(
+            [self._bin["sudo"], self._bin["pacman"], "-Syu", "--noconfirm"],
+            "Updating pacman packages",
+            self._KEYWORDS["pacman"]
         )
 
         # Count updated packages
-        updated = output.count("upgrading") if success else 0
+        updated = updated_count if success else 0
 
         return {
             "success": success,
             "updated": updated,
-            "message": "Updated successfully" if success else "Update failed"
+            "message": "Updated successfully" if success else _failure_message("Update failed", output)
         }
 
     def _update_yay(self) -> Dict:
         """Update AUR packages via yay"""
-        success, output = self._run_command(
-            ["yay", "-Syu", "--noconfirm"],
-            "Updating AUR packages (yay)"
+        success, output, updated_count = self._run_command(
+            [self._bin["yay"], "-Syu", "--noconfirm"],
+            "Updating AUR packages (yay)",
+            self._KEYWORDS["yay"]
         )
 
-        updated = output.count("upgrading") if success else 0
+        updated = updated_count if success else 0
 
         return {
             "success": success,
             "updated": updated,
-            "message": "Updated successfully" if success else "Update failed"
+            "message": "Updated successfully" if success else _failure_message("Update failed", output)
         }
 
     def _update_paru(self) -> Dict:
         """Update AUR packages via paru"""
-        success, output = self._run_command(
-            ["paru", "-Syu", "--noconfirm"],
-            "Updating AUR packages (paru)"
+        success, output, updated_count = self._run_command(
+            [self._bin["paru"], "-Syu", "--noconfirm"],
+            "Updating AUR packages (paru)",
+            self._KEYWORDS["paru"]
         )
 
-        updated = output.count("upgrading") if success else 0
+        updated = updated_count if success else 0
 
         return {
             "success": success,
             "updated": updated,
-            "message": "Updated successfully" if success else "Update failed"
+            "message": "Updated successfully" if success else _failure_message("Update failed", output)
         }
 
     def _update_apt(self) -> Dict:
         """Update apt packages"""
         # Update package lists
-        update_success, _ = self._run_command(
-            ["sudo", "apt", "update"],
+        update_success, update_output, _ = self._run_command(
+            [self._bin["sudo"], self._bin["apt"], "update"],
             "Updating apt package lists"
         )
 
         if not update_success:
-            return {"success": False, "updated": 0, "message": "Failed to update package lists"}
+            return {
+                "success": False,
+                "updated": 0,
+                "message": _failure_message("Failed to update package lists", update_output)
+            }
 
         # Upgrade packages
-        success, output = self._run_command(
-            ["sudo", "apt", "upgrade", "-y"],
-            "Upgrading apt packages"
+        success, output, updated_count = self._run_command(
+            [self._bin["sudo"], self._bin["apt"], "upgrade", "-y"],
+            "Upgrading apt packages",
+            self._KEYWORDS["apt"]
         )
 
         # Count upgraded packages
-        updated = output.count("upgraded") if success else 0
+        updated = updated_count if success else 0
 
         return {
             "success": success,
             "updated": updated,
-            "message": "Updated successfully" if success else "Update failed"
+            "message": "Updated successfully" if success else _failure_message("Update failed", output)
         }
 
     def _update_flatpak(self) -> Dict:
         """Update flatpak applications"""
-        success, output = self._run_command(
-            ["flatpak", "update", "-y"],
-            "Updating flatpak applications"
+        success, output, updated_count = self._run_command(
+            [self._bin["flatpak"], "update", "-y"],
+            "Updating flatpak applications",
+            self._KEYWORDS["flatpak"]
         )
 
         # Count updated apps
-        updated = output.count("updated") if success else 0
+        updated = updated_count if success else 0
 
         return {
             "success": success,
             "updated": updated,
-            "message": "Updated successfully" if success else "Update failed"
+            "message": "Updated successfully" if success else _failure_message("Update failed", output)
         }
 
     def _update_snap(self) -> Dict:
         """Update snap packages"""
-        success, output = self._run_command(
-            ["sudo", "snap", "refresh"],
-            "Updating snap packages"
+        success, output, updated_count = self._run_command(
+            [self._bin["sudo"], self._bin["snap"], "refresh"],
+            "Updating snap packages",
+            self._KEYWORDS["snap"]
         )
 
-        updated = output.count("refreshed") if success else 0
+        updated = updated_count if success else 0
 
         return {
             "success": success,
             "updated": updated,
-            "message": "Updated successfully" if success else "Update failed"
+            "message": "Updated successfully" if success else _failure_message("Update failed", output)
         }
 
     def _update_cargo(self) -> Dict:
         """Update cargo packages"""
-        # First check if cargo-update is installed
-        check_result = subprocess.run(
-            ["cargo", "install-update", "--version"],
-            capture_output=True
-        )
-
-        if check_result.returncode != 0:
+        if not self._has_cargo_update:
             return {
                 "success": False,
                 "updated": 0,
                 "message": "cargo-update not installed (cargo install cargo-update)"
             }
 
-        success, output = self._run_command(
-            ["cargo", "install-update", "-a"],
-            "Updating cargo packages"
+        success, output, updated_count = self._run_command(
+            [self._bin["cargo"], "install-update", "-a"],
+            "Updating cargo packages",
+            self._KEYWORDS["cargo"]
         )
 
-        updated = output.count("updated") if success else 0
+        updated = updated_count if success else 0
 
         return {
             "success": success,
             "updated": updated,
-            "message": "Updated successfully" if success else "Update failed"
+            "message": "Updated successfully" if success else _failure_message("Update failed", output)
         }
 
     def _update_npm(self) -> Dict:
         """Update global npm packages"""
-        success, output = self._run_command(
-            ["npm", "update", "-g"],
-            "Updating global npm packages"
+        success, output, updated_count = self._run_command(
+            [self._bin["npm"], "update", "-g"],
+            "Updating global npm packages",
+            self._KEYWORDS["npm"]
         )
 
         # Count updates
-        updated = output.count("changed") if success else 0
+        updated = updated_count if success else 0
 
         return {
             "success": success,
             "updated": updated,
-            "message": "Updated successfully" if success else "Update failed"
+            "message": "Updated successfully" if success else _failure_message("Update failed", output)
         }
 
     def _update_pip(self) -> Dict:
         """Update pip itself"""
-        success, output = self._run_command(
-            ["pip3", "install", "--upgrade", "pip"],
-            "Updating pip"
+        success, output, installed = self._run_command(
+            [self._bin["pip3"], "install", "--upgrade", "pip"],
+            "Updating pip",
+            self._KEYWORDS["pip"]
         )
 
         return {
             "success": success,
-            "updated": 1 if success and "successfully installed" in output.lower() else 0,
-            "message": "Updated successfully" if success else "Update failed"
+            "updated": 1 if success and installed else 0,
+            "message": "Updated successfully" if success else _failure_message("Update failed", output)
         }
 
     # Cleanup methods
@@ -271,86 +375,101 @@ class SystemMaintainer:
     def _clean_pacman(self) -> Dict:
         """Clean pacman cache and remove orphans"""
         # Clean cache
-        cache_success, _ = self._run_command(
-            ["sudo", "pacman", "-Sc", "--noconfirm"],
+        cache_success, cache_output, _ = self._run_command(
+            [self._bin["sudo"], self._bin["pacman"], "-Sc", "--noconfirm"],
             "Cleaning pacman cache"
         )
 
-        # Remove orphaned packages
-        orphan_success, orphan_output = self._run_command(
-            ["sudo", "pacman", "-Rns", "--noconfirm", "$(pacman -Qtdq)"],
-            "Removing orphaned packages"
-        )
-
-        removed = orphan_output.count("removing") if orphan_success else 0
+        # Remove orphaned packages; there's no shell, so list them first
+        # (pacman -Qtdq exits 1 with no output when there are none)
+        try:
+            orphans = subprocess.run(
+                [self._bin["pacman"], "-Qtdq"],
+                capture_output=True,
+                text=True,
+                timeout=60
+            ).stdout.split()
+        except (OSError, subprocess.TimeoutExpired):
+            orphans = []
+
+        removed = 0
+        if orphans:
+            orphan_success, _, removed_count = self._run_command(
+                [self._bin["sudo"], self._bin["pacman"], "-Rns", "--noconfirm", *orphans],
+                "Removing orphaned packages",
+                "removing"
+            )
+            removed = removed_count if orphan_success else 0
 
         return {
             "success": cache_success,
             "removed": removed,
-            "message": "Cleaned successfully" if cache_success else "Cleanup failed"
+            "message": "Cleaned successfully" if cache_success else _failure_message("Cleanup failed", cache_output)
         }
 
     def _clean_apt(self) -> Dict:
         """Clean apt cache and remove orphans"""
         # Remove unused packages
-        autoremove_success, autoremove_output = self._run_command(
-            ["sudo", "apt", "autoremove", "-y"],
-            "Removing unused apt packages"
+        autoremove_success, _, removed_count = self._run_command(
+            [self._bin["sudo"], self._bin["apt"], "autoremove", "-y"],
+            "Removing unused apt packages",
+            "removed"
         )
 
         # Clean cache
-        clean_success, _ = self._run_command(
-            ["sudo", "apt", "clean"],
+        clean_success, clean_output, _ = self._run_command(
+            [self._bin["sudo"], self._bin["apt"], "clean"],
             "Cleaning apt cache"
         )
 
-        removed = autoremove_output.count("removed") if autoremove_success else 0
+        removed = removed_count if autoremove_success else 0
 
         return {
             "success": autoremove_success and clean_success,
             "removed": removed,
-            "message": "Cleaned successfully" if clean_success else "Cleanup failed"
+            "message": "Cleaned successfully" if clean_success else _failure_message("Cleanup failed", clean_output)
         }
 
     def _clean_flatpak(self) -> Dict:
         """Clean unused flatpak runtimes"""
-        success, output = self._run_command(
-            ["flatpak", "uninstall", "--unused", "-y"],
-            "Removing unused flatpak runtimes"
+        success, output, removed_count = self._run_command(
+            [self._bin["flatpak"], "uninstall", "--unused", "-y"],
+            "Removing unused flatpak runtimes",
+            "uninstalled"
         )
 
-        removed = output.count("uninstalled") if success else 0
+        removed = removed_count if success else 0
 
         return {
             "success": success,
             "removed": removed,
-            "message": "Cleaned successfully" if success else "Cleanup failed"
+            "message": "Cleaned successfully" if success else _failure_message("Cleanup failed", output)
         }
 
     def _clean_cargo(self) -> Dict:
         """Clean cargo cache"""
-        success, output = self._run_command(
-            ["cargo", "cache", "--autoclean"],
+        success, output, _ = self._run_command(
+            [self._bin["cargo"], "cache", "--autoclean"],
             "Cleaning cargo cache"
         )
 
         return {
             "success": success,
             "removed": 0,
-            "message": "Cleaned successfully" if success else "cargo-cache not installed"
+            "message": "Cleaned successfully" if success else _failure_message("cargo-cache not installed", output)
         }
 
     def _clean_npm(self) -> Dict:
         """Clean npm cache"""
-        success, output = self._run_command(
-            ["npm", "cache", "clean", "--force"],
+        success, output, _ = self._run_command(
+            [self._bin["npm"], "cache", "clean", "--force"],
             "Cleaning npm cache"
         )
 
         return {
             "success": success,
             "removed": 0,
-            "message": "Cleaned successfully" if success else "Cleanup failed"
+            "message": "Cleaned successfully" if success else _failure_message("Cleanup failed", output)
         }
 
 
@@ -8,9 +8,10 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from .github_search import search_github_packages
+from ._compat import DATACLASS_SLOTS
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class PackageResult:
     """A package search result"""
     name: str
@@ -573,16 +574,19 @@ class PackageSearcher:
             "github": self.search_github,  # Add GitHub search
         }
         
-        # Execute searches in parallel (only for managers with search functions)
-        with ThreadPoolExecutor(max_workers=6) as executor:  # Increased for GitHub
-            futures = {}
+        # Filter to only managers we have search functions for
+        searchable_managers = [m for m in self.available_managers if m in search_functions]
 
-            # Filter to only managers we have search functions for
-            searchable_managers = [m for m in self.available_managers if m in search_functions]
+        # Always search GitHub, and start it first: it is a network round-trip
+        # and usually the slowest source
+        if "github" in searchable_managers:
+            searchable_managers.remove("github")
+        searchable_managers.insert(0, "github")
 
-            # Always add GitHub search
-            if "github" not in searchable_managers:
-                searchable_managers.append("github")
+        # One worker per source so none waits in the queue; total latency is
+        # the slowest search rather than a sum of batches
+        with ThreadPoolExecutor(max_workers=len(searchable_managers)) as executor:
+            futures = {}
 
             for manager in searchable_managers:
                 future = executor.submit(search_functions[manager], query)
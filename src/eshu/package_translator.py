@@ -219,3 +219,26 @@ class PackageTranslator:
                 unique_terms.append(term)
 
         return unique_terms
+
+    def suggest_search_terms_batch(
+        self,
+        queries: List[str],
+        target_distro: str
+    ) -> List[List[str]]:
+        """
+        Suggest search terms for many queries at once
+
+        Returns one list per query, in the same order. Repeated queries are
+        only resolved once. Lookups are in-memory dict hits, so this stays
+        sequential; a network-backed translator should fan out here instead.
+        """
+        suggestions: Dict[str, List[str]] = {}
+        results = []
+
+        for query in queries:
+            terms = suggestions.get(query)
+            if terms is None:
+                terms = suggestions[query] = self.suggest_search_terms(query, target_distro)
+            results.append(terms)
+
+        return results
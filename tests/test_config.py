@@ -0,0 +1,43 @@
+"""Test configuration persistence"""
+
+import tempfile
+from pathlib import Path
+
+from eshu import config as config_module
+from eshu.config import ESHUConfig, load_config, save_config
+
+
+def test_save_and_load_roundtrip(monkeypatch):
+    """Test that a saved config loads back unchanged"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config_path = Path(tmpdir) / "eshu" / "config.json"
+        monkeypatch.setattr(config_module, "get_config_path", lambda: config_path)
+
+        config = ESHUConfig(llm_provider="ollama", max_tokens=1024)
+        save_config(config)
+
+        loaded = load_config()
+        assert loaded.llm_provider == "ollama"
+        assert loaded.max_tokens == 1024
+        assert loaded.cache_dir == config.cache_dir
+
+
+def test_save_leaves_no_temp_file(monkeypatch):
+    """Test that the atomic write cleans up after itself"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config_path = Path(tmpdir) / "config.json"
+        monkeypatch.setattr(config_module, "get_config_path", lambda: config_path)
+
+        save_config(ESHUConfig())
+
+        assert [p.name for p in Path(tmpdir).iterdir()] == ["config.json"]
+
+
+def test_config_is_frozen_and_hashable():
+    """Test that configs are immutable and usable as cache keys"""
+    config = ESHUConfig()
+    assert hash(config) == hash(ESHUConfig())
+
+    updated = config.model_copy(update={"llm_provider": "openai"})
+    assert updated.llm_provider == "openai"
+    assert config.llm_provider == "anthropic"
@@ -0,0 +1,68 @@
+"""Test Conflict Oracle known-conflict detection"""
+
+import gc
+import tempfile
+import weakref
+from pathlib import Path
+
+from eshu.conflict_oracle import ConflictOracle
+
+
+def _oracle(cache_dir: str) -> ConflictOracle:
+    return ConflictOracle(Path(cache_dir), license_tier="free")
+
+
+def test_known_conflict_detected():
+    """Test that a known conflict is reported"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        conflicts = _oracle(tmpdir).check_conflicts("pipewire", {"pulseaudio", "vim"}, {})
+
+        assert len(conflicts) == 1
+        assert conflicts[0].conflict_type == "known"
+        assert conflicts[0].installed_package == "pulseaudio"
+
+
+def test_known_conflict_matches_package_family():
+    """Test that packages from the same family count as installed"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        oracle = _oracle(tmpdir)
+
+        assert oracle.check_conflicts("nvidia-dkms", {"xf86-video-nouveau"}, {})
+        assert oracle.check_conflicts("cuda", {"lib32-nvidia-utils"}, {})
+
+
+def test_no_conflict_for_unrelated_packages():
+    """Test that unrelated installed packages don't trigger conflicts"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        oracle = _oracle(tmpdir)
+
+        assert oracle.check_conflicts("wine-staging", {"winetricks"}, {}) == []
+        assert oracle.check_conflicts("htop", {"pulseaudio", "nouveau"}, {}) == []
+
+
+def test_system_compatibility_tags():
+    """Test hardware and session incompatibilities are both reported"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        oracle = ConflictOracle(Path(tmpdir), license_tier="premium")
+        system_info = {"gpu": "NVIDIA", "session_type": "wayland"}
+
+        conflicts = oracle._check_system_compatibility("xf86-video-nouveau", system_info)
+        assert {c.conflict_type for c in conflicts} == {"hardware", "system"}
+
+        assert oracle._check_system_compatibility("htop", system_info) == []
+
+
+def test_resolutions_are_flushed_without_pinning_the_oracle():
+    """Test that logged resolutions reach disk on flush and oracles can be freed"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        oracle = _oracle(tmpdir)
+        conflict = oracle.check_conflicts("pipewire", {"pulseaudio"}, {})[0]
+        oracle._log_resolution(conflict, "Remove pulseaudio")
+
+        oracle.flush_resolution_history()
+        assert "Remove pulseaudio" in oracle.resolution_log_path.read_text()
+
+        ref = weakref.ref(oracle)
+        del oracle
+        gc.collect()
+        assert ref() is None
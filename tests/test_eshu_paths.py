@@ -1,6 +1,8 @@
 """Test Eshu's Path curated bundles"""
 
-from eshu.eshu_paths import get_eshu_path, ESHU_PATHS, EshuPath
+from eshu.eshu_paths import (
+    get_eshu_path, get_all_categories, get_paths_by_category, ESHU_PATHS, EshuPath
+)
 
 
 def test_eshu_paths_loaded():
@@ -56,3 +58,17 @@ def test_hyprland_complete_bundle():
     assert "wofi" in packages or "rofi" in packages  # Launcher
     assert "waybar" in packages  # Status bar
     assert "mako" in packages  # Notifications
+
+
+def test_categories_cover_all_paths():
+    """Test that every path is reachable through its category"""
+    categories = get_all_categories()
+    assert len(categories) == len(set(categories))
+
+    grouped = [path for category in categories for path in get_paths_by_category(category)]
+    assert len(grouped) == len(ESHU_PATHS)
+
+
+def test_get_paths_by_unknown_category():
+    """Test that an unknown category yields no paths"""
+    assert get_paths_by_category("nonexistent-category") == []
@@ -0,0 +1,51 @@
+"""Test Eshufile persistence"""
+
+import tempfile
+from pathlib import Path
+
+from eshu.eshufile import EshuFile, EshuFileManager
+
+
+def test_save_and_load_roundtrip():
+    """Test that Eshufiles survive a save/load cycle in both formats"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = EshuFileManager(Path(tmpdir))
+        eshufile = EshuFile(
+            created_on_distro="arch rolling",
+            intents={"editors": ["vim"], "other": ["htop"]},
+            metadata={"arch": "x86_64"}
+        )
+
+        for name in ("system.yaml", "system.eshu"):
+            path = Path(tmpdir) / name
+            manager._save_eshufile(eshufile, path)
+            assert manager._load_eshufile(path) == eshufile
+
+
+def test_load_reuses_parsed_cache():
+    """Test that an unchanged Eshufile is served from the parsed cache"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = EshuFileManager(Path(tmpdir))
+        path = Path(tmpdir) / "system.eshu"
+        manager._save_eshufile(EshuFile(packages=["vim"]), path)
+
+        assert manager._load_eshufile(path).packages == ["vim"]
+        assert len(list(manager.parsed_cache_dir.glob("*.pkl"))) == 1
+
+        # Edited content hashes differently, is parsed fresh and replaces the entry
+        manager._save_eshufile(EshuFile(packages=["emacs"]), path)
+        assert manager._load_eshufile(path).packages == ["emacs"]
+        assert len(list(manager.parsed_cache_dir.glob("*.pkl"))) == 1
+
+
+def test_categorize_packages_by_intent():
+    """Test that installed alternatives map to intents and the rest to other"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = EshuFileManager(Path(tmpdir))
+        categorized = manager._categorize_packages({"neovim", "firefox", "htop"})
+
+        assert categorized == {
+            "editors": ["vim"],
+            "browsers": ["firefox"],
+            "other": ["htop"],
+        }
@@ -0,0 +1,32 @@
+"""Test Ghost Mode environment listing"""
+
+import subprocess
+
+from eshu import ghost_mode
+from eshu.ghost_mode import GhostMode
+
+DISTROBOX_LIST = (
+    b"ID           | NAME                 | STATUS    | IMAGE\n"
+    b"1a2b3c4d5e6f | eshu-ghost-vlc       | Up 2 min  | archlinux:latest\n"
+    b"6f5e4d3c2b1a | dev                  | Exited    | fedora:40\n"
+)
+PODMAN_PS = b"eshu-ghost-gimp\neshu-ghost-mpv\n"
+
+
+def test_list_environments_parses_both_backends(monkeypatch):
+    """Test that ghost containers are found in distrobox and podman output"""
+
+    def fake_run(cmd, **kwargs):
+        stdout = DISTROBOX_LIST if cmd[0] == "distrobox" else PODMAN_PS
+        return subprocess.CompletedProcess(cmd, 0, stdout=stdout, stderr=b"")
+
+    monkeypatch.setattr(ghost_mode, "_has_tool", lambda tool: tool in ("distrobox", "podman"))
+    monkeypatch.setattr(subprocess, "run", fake_run)
+
+    envs = GhostMode().list_environments()
+
+    assert [(env.backend, env.name, env.package_name) for env in envs] == [
+        ("distrobox", "eshu-ghost-vlc", "vlc"),
+        ("podman", "eshu-ghost-gimp", "gimp"),
+        ("podman", "eshu-ghost-mpv", "mpv"),
+    ]
@@ -0,0 +1,126 @@
+"""Test GitHub search response caching"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from eshu import github_search
+from eshu.github_search import GitHubSearcher, normalize_query
+
+REPO = {
+    "name": "ripgrep",
+    "full_name": "BurntSushi/ripgrep",
+    "description": "Fast grep",
+    "stargazers_count": 45000,
+    "language": "Rust",
+    "topics": ["cli"],
+    "fork": False,
+}
+
+
+class FakeResponse:
+    def __init__(self, status_code, items=None, etag=None):
+        self.status_code = status_code
+        self.headers = {"ETag": etag} if etag else {}
+        self._items = items
+
+    @property
+    def content(self):
+        return json.dumps(self.json()).encode()
+
+    def json(self):
+        return {"items": self._items}
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.request_headers = []
+        self.queries = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.request_headers.append(headers or {})
+        self.queries.append(params["q"])
+        return self.responses.pop(0)
+
+
+class PagedSession:
+    def __init__(self, total):
+        self.total = total
+        self.pages = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        page, per_page = params.get("page", 1), params["per_page"]
+        self.pages.append(page)
+        start = (page - 1) * per_page
+        count = max(0, min(per_page, self.total - start))
+        items = [dict(REPO, name=f"repo{start + i}") for i in range(count)]
+        return FakeResponse(200, items)
+
+
+def test_search_revalidates_with_etag(monkeypatch):
+    """Test that stale searches send If-None-Match and reuse items on 304"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        searcher = GitHubSearcher(Path(tmpdir))
+        searcher.session = FakeSession([
+            FakeResponse(200, [REPO], etag='"abc"'),
+            FakeResponse(304),
+        ])
+
+        first = searcher.search_repos("ripgrep")
+        assert [r.name for r in first] == ["ripgrep"]
+
+        # Within the TTL the cached items are used without a request
+        assert [r.name for r in searcher.search_repos("ripgrep")] == ["ripgrep"]
+        assert len(searcher.session.request_headers) == 1
+
+        monkeypatch.setattr(github_search, "SEARCH_CACHE_TTL", 0)
+        second = searcher.search_repos("ripgrep")
+
+        assert searcher.session.request_headers[1] == {"If-None-Match": '"abc"'}
+        assert [r.name for r in second] == ["ripgrep"]
+
+
+def test_rephrased_queries_share_a_cache_key():
+    """Test that filler words and case don't change the normalized query, but order does"""
+    assert normalize_query("install Firefox") == normalize_query("get firefox please") == "firefox"
+    assert normalize_query("firefox not chrome") != normalize_query("chrome not firefox")
+    assert normalize_query('language:rust "terminal for gpus"') == 'language:rust "terminal for gpus"'
+
+
+def test_repos_without_language_are_kept():
+    """Test that a null language falls back to topics instead of failing the search"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        searcher = GitHubSearcher(Path(tmpdir))
+        searcher.session = FakeSession([
+            FakeResponse(200, [dict(REPO, name="dotfiles-cli", language=None)]),
+        ])
+
+        results = searcher.search_repos("dotfiles")
+        assert [(r.name, r.manager) for r in results] == [("dotfiles-cli", "git")]
+
+
+def test_large_searches_fetch_every_page():
+    """Test that results past the first page are fetched and kept in order"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        searcher = GitHubSearcher(Path(tmpdir))
+        searcher.session = PagedSession(total=250)
+
+        results = searcher.search_repos("ripgrep", max_results=300)
+
+        assert [r.name for r in results] == [f"repo{i}" for i in range(250)]
+        assert sorted(searcher.session.pages) == [1, 2, 3]
+
+
+def test_query_is_sent_as_typed():
+    """Test that qualifiers reach GitHub intact while rephrasings share the cache"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        searcher = GitHubSearcher(Path(tmpdir))
+        searcher.session = FakeSession([FakeResponse(200, [REPO])])
+
+        searcher.search_repos("install language:rust terminal emulator")
+        assert searcher.session.queries == ["install language:rust terminal emulator stars:>50"]
+
+        # Served from the cache without a second request
+        assert [r.name for r in searcher.search_repos("language:rust terminal emulator")] == ["ripgrep"]
+        assert len(searcher.session.queries) == 1
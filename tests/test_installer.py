@@ -0,0 +1,176 @@
+"""Test package installation scheduling and command execution"""
+
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from eshu import installer as installer_module
+from eshu.installer import PackageInstaller, _split_command
+from eshu.package_search import PackageResult
+
+PLANS = {
+    "httpie": {"commands": ["pip install --user httpie"], "dependencies": ["python-pip"]},
+    "tokei": {"commands": ["cargo install tokei"], "dependencies": ["rust", "python-pip"]},
+    "htop": {"commands": ["sudo pacman -S htop"], "dependencies": []},
+}
+
+
+class FakeLLM:
+    def generate_install_plans(self, packages, profile):
+        return [
+            dict(requires_build=False, build_system=None, notes="", post_install=[], **PLANS[p.name])
+            for p in packages
+        ]
+
+
+def _installer(build_dir: str) -> PackageInstaller:
+    config = SimpleNamespace(build_dir=Path(build_dir))
+    return PackageInstaller(config, FakeLLM(), SimpleNamespace(available_managers=["pacman"]))
+
+
+def test_install_many_runs_user_level_plans_in_parallel(monkeypatch):
+    """Test that plans without sudo run concurrently and the rest get the terminal"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        installer = _installer(tmpdir)
+        dependency_calls = []
+        runs = {}
+        both_started = threading.Barrier(2, timeout=5)
+
+        def fake_run_plan(plan, package, echo=True):
+            runs[package.name] = (echo, threading.current_thread() is threading.main_thread())
+            if not echo:
+                # Only passes if both user-level plans are running at once
+                both_started.wait()
+            return package.name != "tokei"
+
+        monkeypatch.setattr(installer, "_install_dependencies", lambda deps: dependency_calls.append(deps) or True)
+        monkeypatch.setattr(installer, "_run_plan", fake_run_plan)
+
+        packages = [PackageResult(name, "1.0", "pip", "", "") for name in ("httpie", "htop", "tokei")]
+        results = installer.install_many(packages, auto_confirm=True)
+
+        assert results == [True, True, False]
+        assert dependency_calls == [["python-pip", "rust"]]
+        assert runs["httpie"] == (False, False)
+        assert runs["tokei"] == (False, False)
+        assert runs["htop"] == (True, True)
+
+
+def test_unbalanced_quotes_in_plan_commands_do_not_raise():
+    """Test that malformed LLM commands are split on whitespace instead of crashing"""
+    plan = {"commands": ['echo "unterminated'], "post_install": ["sudo 'make install"]}
+
+    assert _split_command('echo "unterminated') == ["echo", '"unterminated']
+    assert PackageInstaller._needs_terminal(plan)
+
+
+def test_stream_command_keeps_only_the_output_tail(monkeypatch):
+    """Test that a failing command reports the last lines of its output"""
+    monkeypatch.setattr(installer_module, "OUTPUT_TAIL_LINES", 10)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        installer = _installer(tmpdir)
+        script = "import sys\nfor i in range(100): print(f'line {i}')\nsys.exit(2)"
+
+        with pytest.raises(subprocess.CalledProcessError) as excinfo:
+            installer._stream_command([sys.executable, "-c", script], timeout=30, echo=False)
+
+        assert excinfo.value.returncode == 2
+        assert excinfo.value.output.splitlines() == [f"line {i}" for i in range(90, 100)]
+
+        # Success returns normally
+        installer._stream_command([sys.executable, "-c", "print('ok')"], timeout=30, echo=False)
+
+
+def test_stream_command_kills_on_timeout():
+    """Test that a command past its timeout is killed and reported"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        installer = _installer(tmpdir)
+        script = "import time\nprint('started', flush=True)\ntime.sleep(30)"
+
+        start = time.monotonic()
+        with pytest.raises(subprocess.TimeoutExpired) as excinfo:
+            installer._stream_command([sys.executable, "-c", script], timeout=0.5, echo=False)
+
+        assert time.monotonic() - start < 10
+        assert excinfo.value.output == "started\n"
+
+
+def test_verification_probes_the_managers_own_database(monkeypatch):
+    """Test that AUR installs are checked in pacman and nowhere else"""
+    monkeypatch.setattr(installer_module.shutil, "which", lambda name: None)
+    monkeypatch.setattr(
+        installer_module, "_available_managers",
+        lambda: {"pacman": "/usr/bin/pacman", "flatpak": "/usr/bin/flatpak", "yay": "/usr/bin/yay"}
+    )
+    probed = []
+
+    def fake_probe(label, argv, package_name):
+        probed.append(label)
+        return True
+
+    monkeypatch.setattr(PackageInstaller, "_run_probe", staticmethod(fake_probe))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        package = PackageResult("visual-studio-code-bin", "1.0", "yay", "aur", "")
+        assert _installer(tmpdir).verify_installation(package)
+
+    assert probed == ["pacman"]
+
+
+def test_verification_probes_every_database_for_other_managers(monkeypatch):
+    """Test that managers without a database of their own ask all available ones"""
+    monkeypatch.setattr(installer_module.shutil, "which", lambda name: None)
+    monkeypatch.setattr(
+        installer_module, "_available_managers",
+        lambda: {"pacman": "/usr/bin/pacman", "flatpak": "/usr/bin/flatpak"}
+    )
+    probed = []
+    pacman_asked = threading.Event()
+
+    def fake_probe(label, argv, package_name):
+        probed.append(label)
+        if label == "pacman":
+            pacman_asked.set()
+            return False
+        # Answer only once the other probe is running, so both are recorded
+        return pacman_asked.wait(timeout=5)
+
+    monkeypatch.setattr(PackageInstaller, "_run_probe", staticmethod(fake_probe))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        package = PackageResult("ripgrep", "14.0", "cargo", "crates.io", "")
+        assert _installer(tmpdir).verify_installation(package)
+
+    assert sorted(probed) == ["flatpak", "pacman"]
+
+
+def test_probes_match_whole_fields_and_installed_status(monkeypatch):
+    """Test that flatpak needs an exact ID or name and apt needs an installed status"""
+    def fake_run(stdout):
+        return lambda argv, **kwargs: SimpleNamespace(returncode=0, stdout=stdout)
+
+    monkeypatch.setattr(installer_module.subprocess, "run", fake_run("org.gimp.GIMP\tGNU Image Manipulation Program\n"))
+    assert PackageInstaller._run_probe("flatpak", [], "org.gimp.GIMP")
+    assert not PackageInstaller._run_probe("flatpak", [], "gimp")
+
+    monkeypatch.setattr(installer_module.subprocess, "run", fake_run("deinstall ok config-files"))
+    assert not PackageInstaller._run_probe("apt", [], "htop")
+    monkeypatch.setattr(installer_module.subprocess, "run", fake_run("install ok installed"))
+    assert PackageInstaller._run_probe("apt", [], "htop")
+
+
+def test_install_many_reports_same_named_packages_separately(monkeypatch):
+    """Test that results follow input order, not package names"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        installer = _installer(tmpdir)
+        monkeypatch.setattr(installer, "_run_plan", lambda plan, package, echo=True: package.manager == "pacman")
+
+        packages = [PackageResult("htop", "1.0", manager, "", "") for manager in ("flatpak", "pacman")]
+
+        assert installer.install_many(packages, auto_confirm=True) == [False, True]
@@ -1,6 +1,8 @@
 """Test license management functionality"""
 
+import json
 import tempfile
+from datetime import datetime
 from pathlib import Path
 from eshu.license_manager import LicenseManager, License, get_tier_features
 
@@ -68,3 +70,54 @@ def test_key_format_validation():
         assert mgr._validate_key_format("INVALID") is False
         assert mgr._validate_key_format("ESHU-ABC-123") is False
         assert mgr._validate_key_format("WRONG-ABCD-1234-EFGH-5678") is False
+
+
+def test_saved_license_is_reloaded_after_change():
+    """Test that get_license picks up every save despite caching"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mgr = LicenseManager(Path(tmpdir))
+
+        mgr.save_license(License(tier="premium", key="ESHU-TEST-TEST-TEST-TEST", activated_at="2025-01-01"))
+        assert mgr.get_license().has_feature("snapshots") is True
+
+        mgr.save_license(License(tier="free"))
+        assert mgr.get_license().tier == "free"
+
+
+def test_usage_counts_are_shared_and_limited():
+    """Test that usage is counted across managers and stops at the limit"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mgr = LicenseManager(Path(tmpdir))
+        mgr.check_usage_limit("llm_queries")
+        mgr.check_usage_limit("llm_queries")
+
+        other = LicenseManager(Path(tmpdir))
+        assert other.check_usage_limit("llm_queries") == (True, "3/10 used today")
+
+        for _ in range(7):
+            mgr.check_usage_limit("llm_queries")
+        allowed, _ = other.check_usage_limit("llm_queries")
+        assert not allowed
+
+
+def test_legacy_usage_is_imported():
+    """Test that counts from usage.json carry over"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        today = datetime.now().strftime("%Y-%m-%d")
+        mgr = LicenseManager(Path(tmpdir))
+        mgr.usage_file.write_text(json.dumps({today: {"searches": 4}}))
+
+        assert mgr.check_usage_limit("searches") == (True, "5/100 used today")
+        assert not mgr.usage_file.exists()
+
+
+def test_trial_key_verifies_offline():
+    """Test that generated trial keys pass the offline checksum"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mgr = LicenseManager(Path(tmpdir))
+        key = mgr.generate_trial_key("test@example.com")
+
+        assert mgr._validate_key_format(key) is True
+        assert mgr._verify_key_offline(key, "test@example.com") is True
+        tampered = key[:-4] + ("0000" if key[-4:] != "0000" else "FFFF")
+        assert mgr._verify_key_offline(tampered, "test@example.com") is False
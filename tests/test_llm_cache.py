@@ -0,0 +1,46 @@
+"""Test the exact-match LLM response cache"""
+
+import tempfile
+from pathlib import Path
+
+from eshu import llm_cache
+from eshu.llm_cache import LLMCache
+
+
+def test_responses_persist_across_instances():
+    """Test that a stored response is served from disk by a new cache"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "llm_cache.pkl"
+        key = LLMCache.make_key(provider="ollama", model="llama3.1:8b", user="firefox")
+
+        LLMCache(path).set(key, '{"search_terms": ["firefox"]}')
+
+        cache = LLMCache(path)
+        assert cache.get(key) == '{"search_terms": ["firefox"]}'
+        assert cache.get(LLMCache.make_key(provider="ollama", model="llama3.1:8b", user="vlc")) is None
+        assert cache.stats == {"hits": 1, "misses": 1}
+
+
+def test_expired_responses_are_misses():
+    """Test that entries older than the TTL are not returned"""
+    cache = LLMCache(ttl=-1)
+    cache.set("key", "{}")
+
+    assert cache.get("key") is None
+
+
+def test_large_logs_are_compacted(monkeypatch):
+    """Test that a log past the size limit is rewritten with one record per key"""
+    monkeypatch.setattr(llm_cache, "COMPACT_BYTES", 0)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "llm_cache.pkl"
+        writer = LLMCache(path)
+        for i in range(3):
+            writer.set("key", f'{{"n": {i}}}')
+        writer.set("other", "{}")
+        writer._log.close()
+        size = path.stat().st_size
+
+        assert LLMCache(path).get("key") == '{"n": 2}'
+        assert path.stat().st_size < size
+        assert LLMCache(path).get("other") == "{}"
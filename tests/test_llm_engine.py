@@ -0,0 +1,235 @@
+"""Test LLM engine request handling"""
+
+import json
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from eshu import llm_engine
+from eshu.config import ESHUConfig
+from eshu.llm_engine import LLMEngine, _error_tail, _json_body, _strip_code_fence, _try_rule_based_interpret
+from eshu.package_search import PackageResult
+
+PROFILE = SimpleNamespace(distro="arch", distro_version="rolling", available_managers=["pacman", "yay"])
+
+
+class FakeCompletions:
+    def __init__(self, reply):
+        self.reply = reply
+        self.requests = []
+
+    def create(self, stream=False, **kwargs):
+        self.requests.append(kwargs)
+        content = json.dumps(self.reply)
+        if stream:
+            # Deliver the reply a few characters at a time
+            return (
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content[i:i + 5]))])
+                for i in range(0, len(content), 5)
+            )
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeChecker:
+    def check_package(self, name, version, manager):
+        return []
+
+    def get_hardware_info(self):
+        return {"gpu": "Intel", "cpu": "x86_64"}
+
+
+def _engine(cache_dir: str, reply: dict) -> LLMEngine:
+    config = ESHUConfig(llm_provider="ollama", temperature=0.0, cache_dir=Path(cache_dir))
+    engine = LLMEngine(config)
+    engine.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(reply)))
+    return engine
+
+
+def test_repository_installs_skip_the_llm():
+    """Test that plain repository packages get the template plan"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _engine(tmpdir, {"commands": ["echo llm"]})
+        package = PackageResult("htop", "3.3.0-1", "pacman", "extra", "Process viewer")
+
+        plan = engine.generate_install_plan(package, PROFILE)
+
+        assert plan["commands"] == ["sudo pacman -S htop"]
+        assert engine.client.chat.completions.requests == []
+
+
+def test_github_packages_are_planned_by_the_llm():
+    """Test that GitHub results ask the model for a build plan"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        reply = {"commands": ["cargo install --git https://github.com/o/tool"], "requires_build": True,
+                 "build_system": "cargo", "dependencies": [], "post_install": [], "notes": ""}
+        engine = _engine(tmpdir, reply)
+        package = PackageResult("tool", "git:main", "pip", "github:o/tool", "A tool")
+
+        assert engine.generate_install_plan(package, PROFILE) == reply
+        requests = engine.client.chat.completions.requests
+        assert len(requests) == 1
+        assert requests[0]["response_format"] == {"type": "json_object"}
+
+
+def test_streamed_ranking_reports_the_pick_early():
+    """Test that the recommended result is reported while the reply streams"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        reply = {"recommended_index": 1, "explanation": "Native package", "alternatives": [0], "warnings": []}
+        engine = _engine(tmpdir, reply)
+        engine.community_checker = FakeChecker()
+        results = [
+            PackageResult("firefox", "128.0", "flatpak", "flathub", "Browser"),
+            PackageResult("firefox", "128.0-1", "pacman", "extra", "Browser"),
+        ]
+        picks = []
+
+        ranked = engine.rank_and_recommend("firefox", results, PROFILE, on_recommended=picks.append)
+
+        assert picks == [results[1]]
+        assert [r for r, _ in ranked] == [results[1], results[0]]
+
+
+
+def test_reported_pick_stays_first_when_the_reply_is_unusable():
+    """Test that the fallback order agrees with a pick already reported"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # alternatives is not a list of indices, so ranking falls back
+        reply = {"recommended_index": 1, "explanation": "", "alternatives": "none", "warnings": []}
+        engine = _engine(tmpdir, reply)
+        engine.community_checker = FakeChecker()
+        results = [
+            PackageResult("firefox", "128.0", "flatpak", "flathub", "Browser"),
+            PackageResult("firefox", "128.0-1", "pacman", "extra", "Browser"),
+            PackageResult("firefox-esr", "115.0", "pacman", "extra", "Browser"),
+        ]
+        picks = []
+
+        ranked = engine.rank_and_recommend("firefox", results, PROFILE, on_recommended=picks.append)
+
+        assert picks == [results[1]]
+        assert [r for r, _ in ranked] == [results[1], results[0], results[2]]
+
+def test_strip_code_fence():
+    """Test that fenced and bare replies both yield the JSON body"""
+    assert _strip_code_fence('```json\n{"a": 1}\n```\n') == '{"a": 1}'
+    assert _strip_code_fence('  {"a": 1}  ') == '{"a": 1}'
+    assert _strip_code_fence("```") == "```"
+
+
+def test_json_body_drops_surrounding_prose():
+    """Test that a chatty reply still yields its JSON object"""
+    assert _json_body('Sure! Here is the JSON: {"a": {"b": 1}} Hope this helps.') == '{"a": {"b": 1}}'
+    assert _json_body('Here you go:\n```json\n{"a": 1}\n```') == '{"a": 1}'
+    assert _json_body('{"a": 1}') == '{"a": 1}'
+
+
+def test_client_is_created_on_first_use():
+    """Test that building an engine doesn't construct the SDK client"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = LLMEngine(ESHUConfig(llm_provider="ollama", cache_dir=Path(tmpdir)))
+        assert engine._client is None
+
+
+def test_single_result_is_recommended_without_the_llm():
+    """Test that a lone search result skips the ranking request"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _engine(tmpdir, {})
+        engine.community_checker = FakeChecker()
+        results = [PackageResult("htop", "3.3.0-1", "pacman", "extra", "Process viewer")]
+
+        picks = []
+        ranked = engine.rank_and_recommend("process viewer", results, PROFILE, on_recommended=picks.append)
+
+        assert ranked[0][0] is results[0]
+        assert picks == []
+        assert ranked[0][1].startswith("✓ RECOMMENDED")
+        assert engine.client.chat.completions.requests == []
+
+
+def test_error_tail_from_string_and_file():
+    """Test that error analysis gets the end of the output, from text or a log"""
+    output = "configure: ok\n" * 1000 + "error: missing libfoo\n"
+    assert _error_tail(output, 22) == "error: missing libfoo\n"
+    assert _error_tail(None, 22) == ""
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        log = Path(tmpdir) / "build.log"
+        log.write_text(output)
+        assert _error_tail(log, 22) == "error: missing libfoo\n"
+
+
+def test_bundle_suggestion_uses_the_configured_model():
+    """Test that bundle suggestions go through the shared request path"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        reply = {"name": "Complete OBS Setup", "description": "Streaming", "packages": ["obs-studio", "v4l2loopback-dkms"],
+                 "reasoning": "Virtual camera", "category": "media"}
+        engine = _engine(tmpdir, reply)
+
+        bundle = engine.suggest_intelligent_bundle("obs-studio", PROFILE)
+
+        assert bundle["packages"] == ["obs-studio", "v4l2loopback-dkms"]
+        assert bundle["source"] == "ai-generated"
+        assert engine.client.chat.completions.requests[0]["model"] == engine.config.ollama_model
+
+        engine.client.chat.completions.reply = {"packages": []}
+        assert engine.suggest_intelligent_bundle("htop", PROFILE) is None
+
+
+def test_simple_queries_are_interpreted_without_the_llm():
+    """Test that package names and command-like queries skip the model"""
+    assert _try_rule_based_interpret("firefox")["search_terms"] == ["firefox"]
+    assert _try_rule_based_interpret("Install VLC")["intent"] == "install"
+    assert _try_rule_based_interpret("look for screen recorder")["search_terms"] == ["screen recorder"]
+    assert _try_rule_based_interpret("show htop")["intent"] == "info"
+
+    apt = _try_rule_based_interpret("apt install git")
+    assert (apt["preferred_manager"], apt["search_terms"]) == ("apt", ["git"])
+
+    assert _try_rule_based_interpret("something to edit photos") is None
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _engine(tmpdir, {})
+        engine.community_checker = FakeChecker()
+        assert engine.interpret_query("install vlc", PROFILE)["search_terms"] == ["vlc"]
+        assert engine.client.chat.completions.requests == []
+
+
+def test_plans_for_several_packages_keep_their_order(monkeypatch):
+    """Test that batch planning mixes template and LLM plans in input order"""
+    monkeypatch.setattr(llm_engine, "_PLAN_CACHE", {})
+    with tempfile.TemporaryDirectory() as tmpdir:
+        reply = {"commands": ["cargo install --git https://github.com/o/tool"], "requires_build": True,
+                 "build_system": "cargo", "dependencies": [], "post_install": [], "notes": ""}
+        engine = _engine(tmpdir, reply)
+        packages = [
+            PackageResult("tool", "git:main", "pip", "github:o/tool", "A tool"),
+            PackageResult("htop", "3.3.0-1", "pacman", "extra", "Process viewer"),
+        ]
+
+        plans = engine.generate_install_plans(packages, PROFILE)
+
+        assert plans[0] == reply
+        assert plans[1]["commands"] == ["sudo pacman -S htop"]
+        assert len(engine.client.chat.completions.requests) == 1
+
+
+def test_rephrased_interpretations_share_the_cache():
+    """Test that filler words reuse an interpretation but reordered queries don't"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _engine(tmpdir, {"search_terms": ["firefox"], "preferred_manager": None,
+                                  "intent": "install", "requirements": ["not chrome"]})
+        engine.community_checker = FakeChecker()
+        requests = engine.client.chat.completions.requests
+
+        engine.interpret_query("a browser like firefox not chrome", PROFILE)
+        engine.interpret_query("please get me a browser like firefox not chrome", PROFILE)
+        assert len(requests) == 1
+
+        engine.interpret_query("a browser like chrome not firefox", PROFILE)
+        assert len(requests) == 2
+
+        # A different model doesn't reuse the stored interpretation
+        engine.config = engine.config.model_copy(update={"ollama_model": "qwen2.5:7b"})
+        engine.interpret_query("a browser like firefox not chrome", PROFILE)
+        assert len(requests) == 3
@@ -0,0 +1,165 @@
+"""Test system maintenance scheduling"""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from eshu import maintenance
+from eshu.maintenance import SystemMaintainer
+
+
+def test_updates_overlap_but_system_managers_stay_serial(monkeypatch):
+    """Test that user-level managers run alongside the serialized system ones"""
+    maintainer = SystemMaintainer(["pacman", "yay", "flatpak", "npm"])
+    commands = []
+    lock = threading.Lock()
+    npm_started = threading.Event()
+
+    def fake_run(cmd, description, keyword=""):
+        with lock:
+            commands.append(cmd)
+        if cmd[0].endswith("npm"):
+            npm_started.set()
+        elif cmd[0].endswith("flatpak"):
+            # Only finishes if npm was started without waiting for flatpak
+            assert npm_started.wait(timeout=5)
+        return True, "upgrading x\nupgrading y\n", 2
+
+    monkeypatch.setattr(maintainer, "_run_command", fake_run)
+
+    results = maintainer.update_all()
+
+    assert list(results) == ["pacman", "yay", "flatpak", "npm"]
+    assert results["pacman"]["updated"] == 2
+    bin = maintainer._bin
+    system = [cmd for cmd in commands if "-Syu" in cmd]
+    assert system == [[bin["sudo"], bin["pacman"], "-Syu", "--noconfirm"], [bin["yay"], "-Syu", "--noconfirm"]]
+
+
+def test_cleanup_runs_every_manager(monkeypatch):
+    """Test that cleanup reports each available manager in order"""
+    maintainer = SystemMaintainer(["npm", "flatpak", "cargo"])
+    monkeypatch.setattr(maintainer, "_run_command", lambda cmd, description, keyword="": (True, "Uninstalled x\n", 0))
+
+    results = maintainer.clean_all()
+
+    assert list(results) == ["flatpak", "cargo", "npm"]
+    assert all(result["success"] for result in results.values())
+
+
+def test_pacman_orphans_are_listed_before_removal(monkeypatch):
+    """Test that orphans are passed to pacman by name and skipped when none"""
+    maintainer = SystemMaintainer(["pacman"])
+    commands = []
+
+    def fake_run(cmd, description, keyword=""):
+        commands.append(cmd)
+        return True, "removing libfoo...\nremoving libbar...\n", 2
+
+    monkeypatch.setattr(maintainer, "_run_command", fake_run)
+    monkeypatch.setattr(
+        subprocess, "run",
+        lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 0, stdout="libfoo\nlibbar\n", stderr="")
+    )
+
+    assert maintainer.clean_all()["pacman"]["removed"] == 2
+    bin = maintainer._bin
+    assert commands[-1] == [bin["sudo"], bin["pacman"], "-Rns", "--noconfirm", "libfoo", "libbar"]
+
+    commands.clear()
+    monkeypatch.setattr(
+        subprocess, "run",
+        lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 1, stdout="", stderr="")
+    )
+
+    assert maintainer.clean_all()["pacman"]["removed"] == 0
+    assert commands == [[bin["sudo"], bin["pacman"], "-Sc", "--noconfirm"]]
+
+
+def test_run_command_counts_while_streaming():
+    """Test that keyword lines are counted and only the output tail is returned"""
+    script = "for i in range(500): print(f'upgrading pkg{i}' if i % 2 else 'checking')"
+    success, output, count = SystemMaintainer([])._run_command([sys.executable, "-c", script], "test", "upgrading")
+
+    assert success
+    assert count == 250
+    assert output.splitlines()[-1] == "upgrading pkg499"
+    assert len(output.splitlines()) < 500
+
+    success, output, _ = SystemMaintainer([])._run_command([sys.executable, "-c", "raise SystemExit(3)"], "test")
+    assert not success
+
+
+def test_run_command_times_out_when_a_grandchild_holds_the_pipe(monkeypatch):
+    """Test that the timeout returns even if the killed command left a process behind"""
+    monkeypatch.setattr(maintenance, "COMMAND_TIMEOUT", 0.5)
+    script = (
+        "import subprocess, sys, time\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])\n"
+        "open(sys.argv[1], 'w').write(str(child.pid))\n"
+        "time.sleep(30)\n"
+    )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pid_file = Path(tmpdir) / "grandchild.pid"
+        started = time.monotonic()
+        success, output, _ = SystemMaintainer([])._run_command([sys.executable, "-c", script, str(pid_file)], "test")
+        elapsed = time.monotonic() - started
+        os.kill(int(pid_file.read_text()), signal.SIGKILL)
+
+    assert elapsed < 10
+    assert not success
+    assert output == "Command timed out after 0.5 seconds"
+
+
+def test_tools_are_resolved_once(monkeypatch):
+    """Test that commands use absolute paths found at construction"""
+    monkeypatch.setattr("shutil.which", lambda tool: None if tool == "yay" else f"/usr/bin/{tool}")
+    maintainer = SystemMaintainer(["pacman", "yay"])
+
+    assert maintainer._bin["pacman"] == "/usr/bin/pacman"
+    assert maintainer._bin["sudo"] == "/usr/bin/sudo"
+    # Unresolved tools fall back to a PATH search at exec time
+    assert maintainer._bin["yay"] == "yay"
+
+
+def test_cargo_update_is_detected_without_running_cargo(monkeypatch):
+    """Test that the cargo-update check looks for its binary"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setattr("shutil.which", lambda tool: None)
+        monkeypatch.setenv("CARGO_HOME", tmpdir)
+        commands = []
+        maintainer = SystemMaintainer(["cargo"])
+        monkeypatch.setattr(
+            maintainer, "_run_command",
+            lambda cmd, description, keyword="": commands.append(cmd) or (True, "", 0)
+        )
+
+        assert maintainer._update_cargo()["success"] is False
+        assert commands == []
+
+        binary = Path(tmpdir) / "bin" / "cargo-install-update"
+        binary.parent.mkdir()
+        binary.write_text("")
+        binary.chmod(0o755)
+
+        assert SystemMaintainer(["cargo"])._has_cargo_update
+
+
+def test_failures_report_the_end_of_the_output(monkeypatch):
+    """Test that a failed update's message carries the command's last lines"""
+    maintainer = SystemMaintainer(["flatpak"])
+    monkeypatch.setattr(
+        maintainer, "_run_command",
+        lambda cmd, description, keyword="": (False, "Looking for updates...\nerror: No remote refs found\n", 0)
+    )
+
+    result = maintainer.update_all()["flatpak"]
+
+    assert result["success"] is False
+    assert result["message"] == "Update failed:\nLooking for updates...\nerror: No remote refs found"